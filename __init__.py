@@ -16,8 +16,10 @@
 import bpy
 from .src.manager import manager
 from .src.ops.start import UVGAMI_OT_start
+from .src.ops.resume import UVGAMI_OT_resume_batch
 from .src.ops.stop import (
     UVGAMI_OT_stop,
+    UVGAMI_OT_pause,
     UVGAMI_OT_cancel,
     UVGAMI_OT_cancel_all,
 )
@@ -37,6 +39,7 @@ from .src.ops.misc import (
     UVGAMI_OT_open_preferences,
     UVGAMI_OT_preview_symmetry,
     UVGAMI_OT_setup_wsl,
+    UVGAMI_OT_clear_cache,
 )
 from .src.ops.grid import (
     UVGAMI_OT_add_grid,
@@ -49,6 +52,7 @@ from .src.ops.viewer import (
 from .src.ops.info import (
     UVGAMI_OT_clear_logs,
     UVGAMI_OT_copy_logs,
+    UVGAMI_OT_export_telemetry,
 )
 from .src.ui.panels import (
     UVGAMI_PT_main,
@@ -82,7 +86,9 @@ bl_info = {
 
 classes = (
     UVGAMI_OT_start,
+    UVGAMI_OT_resume_batch,
     UVGAMI_OT_stop,
+    UVGAMI_OT_pause,
     UVGAMI_OT_cancel_all,
     UVGAMI_OT_expand,
     UVGAMI_OT_open_preferences,
@@ -100,8 +106,10 @@ classes = (
     UVGAMI_OT_mark_seams_sharp,
     UVGAMI_OT_clear_logs,
     UVGAMI_OT_copy_logs,
+    UVGAMI_OT_export_telemetry,
     UVGAMI_OT_setup_wsl,
     UVGAMI_OT_view_uvs,
+    UVGAMI_OT_clear_cache,
     UVGAMI_PT_main,
     UVGAMI_PT_guides,
     UVGAMI_PT_symmetry,
@@ -0,0 +1,33 @@
+# Copyright (C) 2022 Daniel Boxer
+# See __init__.py and LICENSE for more information
+
+# Unwrap .blend and .obj files without the ui. UVgami has to be installed.
+#
+# blender -b -P <uvgami folder>/batch.py -- --settings settings.json
+#     --output results a.blend b.obj
+#
+# The settings file is JSON with the same names as the UVgami scene settings,
+# for example {"quality": "HIGH", "untriangulate": true, "sym_axes": ["X"]}.
+# The results and summary.json are written to the output folder.
+
+import importlib
+import pathlib
+import sys
+
+import addon_utils
+
+
+def find_addon():
+    """Module name of the installed add-on this file belongs to."""
+    here = pathlib.Path(__file__).resolve().parent
+    for module in addon_utils.modules():
+        if pathlib.Path(module.__file__).resolve().parent == here:
+            return module.__name__
+    return None
+
+
+name = find_addon()
+if name is None:
+    sys.exit("UVgami: run batch.py from the installed add-on folder")
+addon_utils.enable(name, default_set=True)
+sys.exit(importlib.import_module(f"{name}.src.batch").main())
@@ -133,7 +133,12 @@ int Optimizer::solve(int maxIter) {
         }
         globalIterNum++;
         if (propagateFracture > 0) {
-            if (!createFracture(lastEDec, propagateFracture)) {
+            bool isFractured;
+            {
+                ScopedTimer timer(timings.topology);
+                isFractured = createFracture(lastEDec, propagateFracture);
+            }
+            if (!isFractured) {
                 // always perform the one decreasing E_w more
                 if (scaffolding) {
                     scaffold = Scaffold(result, UV_bnds_scaffold, E_scaffold,
@@ -172,6 +177,7 @@ void Optimizer::updatePrecondMtrAndFactorize(void) {
     // std::cout << "recompute proxy/Hessian matrix and factorize..." <<
     // std::endl;
     computeHessian(result, scaffold);
+    ScopedTimer timer(timings.factorize);
     if (useDense) {
         denseSolver = Hessian.ldlt();
     } else {
@@ -225,6 +231,7 @@ void Optimizer::updateEnergyData(bool updateEVal, bool updateGradient,
         // std::cout << "recompute proxy/Hessian matrix and factorize..." <<
         // std::endl;
         computeHessian(result, scaffold);
+        ScopedTimer timer(timings.factorize);
         if (useDense) {
             if (!needRefactorize)
                 denseSolver = Hessian.ldlt();
@@ -345,6 +352,7 @@ bool Optimizer::solve_oneStep(void) {
         if (!fractureInitiated)
             computeHessian(result, scaffold);
         // std::cout << "factorizing proxy/Hessian matrix..." << std::endl;
+        ScopedTimer timer(timings.factorize);
         if (!fractureInitiated) {
             if (!useDense) {
                 if (scaffolding) {
@@ -378,6 +386,7 @@ bool Optimizer::solve_oneStep(void) {
 }
 
 bool Optimizer::lineSearch(void) {
+    ScopedTimer timer(timings.lineSearch);
     bool stopped = false;
     double stepSize = 1.0;
     initStepSize(result, stepSize);
@@ -524,6 +533,7 @@ void Optimizer::computeGradient(const TriMesh &data,
 }
 void Optimizer::computeHessian(const TriMesh &data,
                                const Scaffold &scaffoldData) {
+    ScopedTimer timer(timings.hessian);
     if (useDense) {
         energyTerms[0]->computeHessian(data, Hessian);
         Hessian *= energyParams[0];
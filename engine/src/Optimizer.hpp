@@ -53,6 +53,16 @@ class Optimizer {
     void setAllowEDecRelTol(bool p_allowEDecRelTol);
     double getLastEnergyVal(bool excludeScaffold = false) const;
 
+    // seconds spent in each part since they were last reset, for telemetry
+    // the parts are exclusive, topology doesn't include the hessian assembly,
+    // factorization and line search of the solves made while trying changes
+    struct Timings {
+        double hessian = 0.0;
+        double factorize = 0.0;
+        double lineSearch = 0.0;
+        double topology = 0.0;
+    } timings;
+
   protected:                                  // referenced data
     const TriMesh &data0;                     // initial guess
     const std::vector<Energy *> &energyTerms; // E_0, E_1, E_2, ...
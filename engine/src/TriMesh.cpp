@@ -14,6 +14,9 @@
 #include "SymDirichletEnergy.hpp"
 #include "Optimizer.hpp"
 
+#include <chrono>
+#include <cstdint>
+#include <fstream>
 #include <map>
 #include <set>
 #include <streambuf>
@@ -28,6 +31,33 @@ extern int inSplitTotalAmt;
 
 namespace uvgami {
 
+namespace {
+// binary mesh, read by the add-on without parsing text
+// header: int32 magic, version, vertex count, face count, uv count, reserved
+// then float64 positions (x, y, z), float64 uvs (u, v), int32 faces and int32
+// uv faces (3 per face, only if there are uvs), all little endian
+// the doubles come first so they stay aligned when the file is mapped
+const int32_t meshMagic = 0x4D475655; // "UVGM"
+const int32_t meshVersion = 1;
+using RowMatrixXd =
+    Eigen::Matrix<double, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor>;
+using RowMatrixXi =
+    Eigen::Matrix<int32_t, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor>;
+
+template <typename Matrix> void writeRows(std::ofstream &out, const Matrix &m) {
+    out.write(reinterpret_cast<const char *>(m.data()),
+              m.size() * sizeof(typename Matrix::Scalar));
+}
+
+template <typename Matrix> bool readRows(std::ifstream &in, Matrix &m) {
+    if (m.size() == 0)
+        return true;
+    return static_cast<bool>(
+        in.read(reinterpret_cast<char *>(m.data()),
+                m.size() * sizeof(typename Matrix::Scalar)));
+}
+} // namespace
+
 TriMesh::TriMesh(void) : surfaceArea(0), curFracTail(0), initSeamLen(0) {}
 
 TriMesh::TriMesh(const Eigen::MatrixXd &V_mesh, const Eigen::MatrixXi &F_mesh,
@@ -1720,8 +1750,152 @@ bool TriMesh::saveAsMesh(const Eigen::MatrixXi &F0, bool scaleUV) const {
     return save(V_mesh, F0, UV_mesh, F);
 }
 
+// binary snapshot for the live viewer, read by mapping the file in python
+// full snapshot header: int32 magic, version, uv count, face count
+// then float32 uvs (u, v) and int32 face uv indices (3 per face)
+// delta snapshot header: int32 magic, version, uv count, changed count
+// then int32 indices of the changed uvs and their float32 uvs (u, v)
+bool TriMesh::saveSnapshot(const std::string &filePath, bool delta,
+                           double tolerance) {
+    const auto startTime = std::chrono::steady_clock::now();
+    const int32_t fullMagic = 0x53475655;  // "UVGS"
+    const int32_t deltaMagic = 0x44475655; // "UVGD"
+    const int32_t version = 1;
+    const int32_t uvCount = static_cast<int32_t>(V.rows());
+    const int32_t faceCount = static_cast<int32_t>(F.rows());
+
+    // same scaling as saveAsMesh
+    const Eigen::VectorXd &u = V.col(0);
+    const Eigen::VectorXd &v = V.col(1);
+    const double uMin = u.minCoeff();
+    const double vMin = v.minCoeff();
+    const double scale = (std::max)(u.maxCoeff() - uMin, v.maxCoeff() - vMin);
+    std::vector<float> uvs(2 * uvCount);
+    for (int uvI = 0; uvI < uvCount; uvI++) {
+        uvs[2 * uvI] = static_cast<float>((V(uvI, 0) - uMin) / scale);
+        uvs[2 * uvI + 1] = static_cast<float>((V(uvI, 1) - vMin) / scale);
+    }
+
+    // a delta is only possible if the topology hasn't changed, seams split
+    // vertices and change the faces
+    delta = delta && snapshotUV.size() == uvs.size() &&
+            snapshotF.rows() == F.rows() && snapshotF == F;
+
+    std::ofstream out(filePath, std::ios::binary | std::ios::trunc);
+    if (!out.is_open()) {
+        // the text fallback is sent instead, the next snapshot has to be full
+        snapshotUV.clear();
+        return false;
+    }
+    if (delta) {
+        // compared to what python has, not the previous iteration, so slow
+        // movement still shows up once it adds up
+        std::vector<int32_t> changed;
+        std::vector<float> changedUV;
+        for (int32_t uvI = 0; uvI < uvCount; uvI++) {
+            const float du = uvs[2 * uvI] - snapshotUV[2 * uvI];
+            const float dv = uvs[2 * uvI + 1] - snapshotUV[2 * uvI + 1];
+            if (du * du + dv * dv > tolerance * tolerance) {
+                changed.push_back(uvI);
+                changedUV.push_back(uvs[2 * uvI]);
+                changedUV.push_back(uvs[2 * uvI + 1]);
+                snapshotUV[2 * uvI] = uvs[2 * uvI];
+                snapshotUV[2 * uvI + 1] = uvs[2 * uvI + 1];
+            }
+        }
+        const int32_t changedCount = static_cast<int32_t>(changed.size());
+        out.write(reinterpret_cast<const char *>(&deltaMagic),
+                  sizeof(deltaMagic));
+        out.write(reinterpret_cast<const char *>(&version), sizeof(version));
+        out.write(reinterpret_cast<const char *>(&uvCount), sizeof(uvCount));
+        out.write(reinterpret_cast<const char *>(&changedCount),
+                  sizeof(changedCount));
+        out.write(reinterpret_cast<const char *>(changed.data()),
+                  changed.size() * sizeof(int32_t));
+        out.write(reinterpret_cast<const char *>(changedUV.data()),
+                  changedUV.size() * sizeof(float));
+    } else {
+        std::vector<int32_t> indices(3 * faceCount);
+        for (int triI = 0; triI < faceCount; triI++) {
+            for (int localVI = 0; localVI < 3; localVI++)
+                indices[3 * triI + localVI] = F(triI, localVI);
+        }
+        out.write(reinterpret_cast<const char *>(&fullMagic),
+                  sizeof(fullMagic));
+        out.write(reinterpret_cast<const char *>(&version), sizeof(version));
+        out.write(reinterpret_cast<const char *>(&uvCount), sizeof(uvCount));
+        out.write(reinterpret_cast<const char *>(&faceCount), sizeof(faceCount));
+        out.write(reinterpret_cast<const char *>(uvs.data()),
+                  uvs.size() * sizeof(float));
+        out.write(reinterpret_cast<const char *>(indices.data()),
+                  indices.size() * sizeof(int32_t));
+        snapshotUV = uvs;
+        snapshotF = F;
+    }
+    out.close();
+    if (out.fail()) {
+        snapshotUV.clear();
+        return false;
+    }
+
+    // one line instead of a line per uv, with the seconds it took so the
+    // add-on can limit how often it asks
+    const std::chrono::duration<double> elapsed =
+        std::chrono::steady_clock::now() - startTime;
+    std::cout << "snapshot_ready: " << elapsed.count() << std::endl;
+    return true;
+}
+
+bool TriMesh::saveBinary(const std::string &filePath,
+                         const Eigen::MatrixXd &V, const Eigen::MatrixXi &F,
+                         const Eigen::MatrixXd &UV,
+                         const Eigen::MatrixXi &FUV) const {
+    const bool hasUV = UV.rows() != 0 && FUV.rows() == F.rows();
+    const int32_t header[6] = {meshMagic,
+                               meshVersion,
+                               static_cast<int32_t>(V.rows()),
+                               static_cast<int32_t>(F.rows()),
+                               hasUV ? static_cast<int32_t>(UV.rows()) : 0,
+                               0};
+    std::ofstream out(filePath + ".uvgm", std::ios::binary | std::ios::trunc);
+    if (!out.is_open())
+        return false;
+    out.write(reinterpret_cast<const char *>(header), sizeof(header));
+    // eigen matrices are column major
+    writeRows(out, RowMatrixXd(V));
+    if (hasUV)
+        writeRows(out, RowMatrixXd(UV));
+    writeRows(out, RowMatrixXi(F.cast<int32_t>()));
+    if (hasUV)
+        writeRows(out, RowMatrixXi(FUV.cast<int32_t>()));
+    return out.good();
+}
+
+bool TriMesh::loadBinary(const std::string &filePath, Eigen::MatrixXd &V,
+                         Eigen::MatrixXi &F, Eigen::MatrixXd &UV,
+                         Eigen::MatrixXi &FUV) {
+    std::ifstream in(filePath, std::ios::binary);
+    int32_t header[6];
+    if (!in.read(reinterpret_cast<char *>(header), sizeof(header)) ||
+        header[0] != meshMagic || header[1] != meshVersion || header[2] < 0 ||
+        header[3] < 0 || header[4] < 0)
+        return false;
+    RowMatrixXd V_rows(header[2], 3);
+    RowMatrixXd UV_rows(header[4], 2);
+    RowMatrixXi F_rows(header[3], 3);
+    RowMatrixXi FUV_rows(header[4] != 0 ? header[3] : 0, 3);
+    if (!readRows(in, V_rows) || !readRows(in, UV_rows) ||
+        !readRows(in, F_rows) || !readRows(in, FUV_rows))
+        return false;
+    V = V_rows;
+    UV = UV_rows;
+    F = F_rows.cast<int>();
+    FUV = FUV_rows.cast<int>();
+    return true;
+}
+
 bool TriMesh::saveAsMesh(const std::string &filePath, const Eigen::MatrixXi &F0,
-                         bool scaleUV) const {
+                         bool scaleUV, bool binary) const {
     assert(F0.rows() == F.rows());
     assert(F0.cols() == 3);
 
@@ -1750,6 +1924,8 @@ bool TriMesh::saveAsMesh(const std::string &filePath, const Eigen::MatrixXi &F0,
         }
     }
 
+    if (binary)
+        return saveBinary(filePath, V_mesh, F0, UV_mesh, F);
     return save(filePath, V_mesh, F0, UV_mesh, F);
 }
 
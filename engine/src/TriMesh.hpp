@@ -57,6 +57,11 @@ class TriMesh {
 
     std::set<int> fracTail;
     int curFracTail;
+
+    // last uvs and faces written to the snapshot file, deltas are made
+    // against them
+    std::vector<float> snapshotUV;
+    Eigen::MatrixXi snapshotF;
     std::pair<int, int> curInteriorFracTails;
     double initSeamLen;
 
@@ -121,9 +126,17 @@ class TriMesh {
     bool save(const Eigen::MatrixXd &V, const Eigen::MatrixXi &F,
               const Eigen::MatrixXd UV,
               const Eigen::MatrixXi &FUV = Eigen::MatrixXi()) const;
+    bool saveBinary(const std::string &filePath, const Eigen::MatrixXd &V,
+                    const Eigen::MatrixXi &F, const Eigen::MatrixXd &UV,
+                    const Eigen::MatrixXi &FUV) const;
+    static bool loadBinary(const std::string &filePath, Eigen::MatrixXd &V,
+                           Eigen::MatrixXi &F, Eigen::MatrixXd &UV,
+                           Eigen::MatrixXi &FUV);
     bool saveAsMesh(const std::string &filePath, const Eigen::MatrixXi &F0,
-                    bool scaleUV) const;
+                    bool scaleUV, bool binary = false) const;
     bool saveAsMesh(const Eigen::MatrixXi &F0, bool scaleUV) const;
+    bool saveSnapshot(const std::string &filePath, bool delta,
+                      double tolerance);
 
   public: // helper function
     void computeLaplacianMtr(void);
@@ -27,4 +27,34 @@ class ChronoTimer {
     std::chrono::high_resolution_clock::time_point finishTime;
 };
 
+// adds the seconds until it goes out of scope to total, without the time of
+// the timers made inside it, so the totals don't count any time twice
+class ScopedTimer {
+  public:
+    explicit ScopedTimer(double &p_total)
+        : total(p_total), parent(current),
+          startTime(std::chrono::steady_clock::now()) {
+        current = this;
+    }
+    ~ScopedTimer() {
+        std::chrono::duration<double> elapsed =
+            std::chrono::steady_clock::now() - startTime;
+        total += elapsed.count() - nested;
+        if (parent)
+            parent->nested += elapsed.count();
+        current = parent;
+    }
+    ScopedTimer(const ScopedTimer &) = delete;
+    ScopedTimer &operator=(const ScopedTimer &) = delete;
+
+  private:
+    // innermost running timer of this thread
+    static inline thread_local ScopedTimer *current = nullptr;
+
+    double &total;
+    ScopedTimer *parent;
+    double nested = 0.0;
+    std::chrono::steady_clock::time_point startTime;
+};
+
 } // namespace uvgami
@@ -1,4 +1,6 @@
 #include <cfloat>
+#include <chrono>
+#include <cstdlib>
 #include <string>
 #include <filesystem>
 #include <fstream>
@@ -71,6 +73,8 @@ int inSplitTotalAmt;
 // std::ofstream logFile;
 std::string outputFolderPath;
 std::string meshName;
+// the output is written in the format of the input
+bool binaryMesh = false;
 
 // visualization
 bool headlessMode = false;
@@ -95,6 +99,14 @@ bool mute = true;
 std::atomic<bool> forceQuit = false;
 std::atomic<bool> forceQuitSave = false;
 std::atomic<bool> snapshot = false;
+// only uvs that moved further than the tolerance are written
+std::atomic<bool> snapshotDelta = false;
+double snapshotTolerance = 0.0;
+// binary snapshots are written here when set, otherwise they are printed
+std::string snapshotFilePath;
+// print a telemetry line after every outer iteration
+bool telemetry = false;
+std::chrono::steady_clock::time_point telemetryTime;
 int maxSeamWeight = 100;
 
 const char *pathSeparator() {
@@ -117,6 +129,12 @@ void stdin_listener() {
             forceQuit = true;
             forceQuitSave = false;
         } else if (line == "snapshot") {
+            snapshotDelta = false;
+            snapshot = true;
+        } else if (line == "snapshot_delta") {
+            // followed by the tolerance in normalised uv space
+            std::cin >> snapshotTolerance;
+            snapshotDelta = true;
             snapshot = true;
         }
     } while (!line.empty());
@@ -277,7 +295,10 @@ void updateViewerData(const std::string &meshName) {
     viewer_.data().compute_normals();
 
     if (snapshot) {
-        triSoup[channel_result]->saveAsMesh(F, true);
+        if (snapshotFilePath.empty() ||
+            !triSoup[channel_result]->saveSnapshot(
+                snapshotFilePath, snapshotDelta, snapshotTolerance))
+            triSoup[channel_result]->saveAsMesh(F, true);
         snapshot = false;
     }
 }
@@ -296,7 +317,8 @@ bool postDrawFunc(igl::opengl::glfw::Viewer &viewer) {
     if (canSaveMesh) {
         // save mesh
         if (outerLoopFinished) {
-            if (!triSoup[channel_result]->saveAsMesh(outputFolderPath, F, true))
+            if (!triSoup[channel_result]->saveAsMesh(outputFolderPath, F, true,
+                                                     binaryMesh))
                 std::cerr << "Unable to save mesh" << std::endl;
             mainTimer.finish();
         }
@@ -690,6 +712,21 @@ void converge_preDrawFunc(igl::opengl::glfw::Viewer &viewer) {
     outerLoopFinished = true;
 }
 
+// iteration, energy, seam length, seconds of the iteration, seconds in hessian
+// assembly, factorization, line search and topology, face count
+void printTelemetry(double energy, double seamLength) {
+    const auto now = std::chrono::steady_clock::now();
+    const std::chrono::duration<double> elapsed = now - telemetryTime;
+    telemetryTime = now;
+    const auto &timings = optimizer->timings;
+    std::cout << "telemetry: " << iterNum << " " << energy << " " << seamLength
+              << " " << elapsed.count() << " " << timings.hessian << " "
+              << timings.factorize << " " << timings.lineSearch << " "
+              << timings.topology << " " << triSoup[channel_result]->F.rows()
+              << std::endl;
+    optimizer->timings = uvgami::Optimizer::Timings();
+}
+
 bool preDrawFunc(igl::opengl::glfw::Viewer &viewer) {
     if (optimization_on) {
         while (!converged)
@@ -723,52 +760,59 @@ bool preDrawFunc(igl::opengl::glfw::Viewer &viewer) {
         //  triSoup[channel_result]->V_rest.rows() << std::endl;
 
         // continue to split boundary
-        if (!updateLambda_stationaryV()) {
-            // oscillation detected
-            converge_preDrawFunc(viewer);
-        } else {
-            // DISABLE logFile << "boundary op V " <<
-            // triSoup[channel_result]->V_rest.rows() << std::endl;
-            if (optimizer->createFracture(fracThres, false, topoLineSearch)) {
-                converged = 0;
+        {
+            uvgami::ScopedTimer timer(optimizer->timings.topology);
+            if (!updateLambda_stationaryV()) {
+                // oscillation detected
+                converge_preDrawFunc(viewer);
             } else {
-                // if no boundary op, try interior split if split is the current
-                // best boundary op
-                if ((measure_bound > upperBound) &&
-                    optimizer->createFracture(fracThres, false, topoLineSearch,
-                                              true)) {
-                    // DISABLE logFile << "interior split " <<
-                    // triSoup[channel_result]->V_rest.rows() << std::endl;
+                // DISABLE logFile << "boundary op V " <<
+                // triSoup[channel_result]->V_rest.rows() << std::endl;
+                if (optimizer->createFracture(fracThres, false,
+                                              topoLineSearch)) {
                     converged = 0;
                 } else {
-                    if (!updateLambda_stationaryV(false, true)) {
-                        // all converged
-                        converge_preDrawFunc(viewer);
+                    // if no boundary op, try interior split if split is the
+                    // current best boundary op
+                    if ((measure_bound > upperBound) &&
+                        optimizer->createFracture(fracThres, false,
+                                                  topoLineSearch, true)) {
+                        // DISABLE logFile << "interior split " <<
+                        // triSoup[channel_result]->V_rest.rows() << std::endl;
+                        converged = 0;
                     } else {
-                        // split or merge after lambda update
-                        if (reQuery) {
-                            filterExp_in +=
-                                std::log(2.0) / std::log(inSplitTotalAmt);
-                            filterExp_in = (std::min)(1.0, filterExp_in);
-                            while (!optimizer->createFracture(
-                                fracThres, false, topoLineSearch, true)) {
+                        if (!updateLambda_stationaryV(false, true)) {
+                            // all converged
+                            converge_preDrawFunc(viewer);
+                        } else {
+                            // split or merge after lambda update
+                            if (reQuery) {
                                 filterExp_in +=
                                     std::log(2.0) / std::log(inSplitTotalAmt);
                                 filterExp_in = (std::min)(1.0, filterExp_in);
+                                while (!optimizer->createFracture(
+                                    fracThres, false, topoLineSearch, true)) {
+                                    filterExp_in += std::log(2.0) /
+                                                    std::log(inSplitTotalAmt);
+                                    filterExp_in =
+                                        (std::min)(1.0, filterExp_in);
+                                }
+                                reQuery = false;
+                                // TODO: set filtering param back?
+                            } else {
+                                optimizer->createFracture(
+                                    opType_queried, path_queried,
+                                    newVertPos_queried, topoLineSearch);
                             }
-                            reQuery = false;
-                            // TODO: set filtering param back?
-                        } else {
-                            optimizer->createFracture(
-                                opType_queried, path_queried,
-                                newVertPos_queried, topoLineSearch);
+                            opType_queried = -1;
+                            converged = 0;
                         }
-                        opType_queried = -1;
-                        converged = 0;
                     }
                 }
             }
         }
+        if (telemetry)
+            printTelemetry(E_SD, E_se);
     } else {
         if (isCapture3D && (capture3DI < 2)) {
             // change view accordingly
@@ -869,6 +913,12 @@ int main(int argc, char *argv[]) {
         }
         if (upperBoundArg.isSet())
             upperBound = upperBoundArg.getValue();
+        // an environment variable so older add-on versions still work
+        if (const char *path = std::getenv("UVGAMI_SNAPSHOT_FILE"))
+            snapshotFilePath = path;
+        if (const char *value = std::getenv("UVGAMI_TELEMETRY"))
+            telemetry = std::string(value) == "1";
+        telemetryTime = std::chrono::steady_clock::now();
     } catch (TCLAP::ArgException &e) // catch any exceptions
     {
         std::cerr << "error: " << e.error() << " for arg " << e.argId()
@@ -894,6 +944,9 @@ int main(int argc, char *argv[]) {
         loadSucceed = igl::readOFF(meshFilePath, V, F);
     } else if (suffix == ".obj") {
         loadSucceed = igl::readOBJ(meshFilePath, V, UV, N, F, FUV, FN);
+    } else if (suffix == ".uvgm") {
+        loadSucceed = uvgami::TriMesh::loadBinary(meshFilePath, V, F, UV, FUV);
+        binaryMesh = true;
     } else {
         std::cout << "unkown mesh file format" << std::endl;
         return UVGAMI_RC_UNKNOWN_MESH_FORMAT;
@@ -0,0 +1,239 @@
+# Copyright (C) 2022 Daniel Boxer
+# See __init__.py and LICENSE for more information
+
+import argparse
+import json
+import pathlib
+import sys
+import time
+import traceback
+
+import bpy
+
+from . import telemetry
+from .handler import handle_error
+from .logger import logger
+from .manager import manager
+from .ops.start import UnwrapPipeline
+from .utils.io import export_objects, import_objects
+from .utils.mesh import check_collection, deselect_all, move_to_collection
+from .utils.paths import get_preferences
+
+# used when the settings file doesn't set them, a batch should use every core
+BATCH_DEFAULTS = {"concurrent": True, "auto_cores": True}
+
+
+class BatchRunner(UnwrapPipeline):
+    """Run the unwrap pipeline in background mode, without the ui or timers."""
+
+    def __init__(self):
+        self.reset_variables()
+        self.messages = []
+
+    def report(self, type, message):
+        self.messages.append(message)
+        print(f"UVgami: {message}")
+
+    def unwrap_scene(self, context):
+        """Unwrap all visible meshes in the scene, blocks until all are done."""
+        objects = [
+            o
+            for o in context.view_layer.objects
+            if o.type == "MESH" and o.visible_get()
+        ]
+        if not objects:
+            self.report({"WARNING"}, "No meshes to unwrap")
+            return False
+
+        if context.object is not None and context.object.mode != "OBJECT":
+            bpy.ops.object.mode_set(mode="OBJECT")
+        deselect_all()
+        for obj in objects:
+            obj.select_set(True)
+        context.view_layer.objects.active = objects[0]
+
+        start_objects = set(bpy.data.objects)
+        try:
+            logger.new_info()
+            self.engine_path = pathlib.Path(get_preferences().engine_path)
+            if self._validate_engine_path() is not None:
+                return False
+            if self._prepare_unwrap_session(context) is not None:
+                return False
+            self.queue_unwraps(context)
+            context.view_layer.objects.active = self.old_active
+        except Exception as e:
+            self.messages.extend(traceback.format_exc().split("\n")[:-1])
+            handle_error(e, "START", objects=start_objects)
+            return False
+        finally:
+            self.reset_variables()
+
+        manager.run_blocking()
+        return True
+
+
+def apply_settings(props, settings):
+    """Set scene properties from a dictionary of UVGAMI_PG_properties values."""
+    for name, value in {**BATCH_DEFAULTS, **settings}.items():
+        if name not in props.__annotations__:
+            raise ValueError(f"Unknown setting: {name}")
+        # enum flag properties like the axes are lists in json
+        if isinstance(value, list):
+            value = set(value)
+        setattr(props, name, value)
+
+
+def load_settings(path):
+    if path is None:
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def run_blend(path, settings, output_dir):
+    """Unwrap a .blend file and save a copy with the results."""
+    bpy.ops.wm.open_mainfile(filepath=str(path))
+    apply_settings(bpy.context.scene.uvgami, settings)
+
+    runner = BatchRunner()
+    started = runner.unwrap_scene(bpy.context)
+    output = None
+    if started and manager.outputs:
+        output = output_dir / f"{path.stem}_unwrapped.blend"
+        bpy.ops.wm.save_as_mainfile(filepath=str(output), copy=True)
+
+    return [_result(path, output, started, runner, None)]
+
+
+def run_objs(paths, settings, output_dir):
+    """Unwrap .obj files together so they share the cores, then export each."""
+    bpy.ops.wm.read_homefile(use_empty=True)
+    apply_settings(bpy.context.scene.uvgami, settings)
+
+    # input object names of each file
+    names = {}
+    for path in paths:
+        before = set(bpy.context.scene.objects)
+        import_objects(path)
+        collection = check_collection(path.stem, bpy.context.scene.collection)
+        names[path] = set()
+        for obj in set(bpy.context.scene.objects).difference(before):
+            move_to_collection(obj, collection)
+            names[path].add(obj.name)
+
+    runner = BatchRunner()
+    started = runner.unwrap_scene(bpy.context)
+
+    results = []
+    for path in paths:
+        outputs = [o for name, o in manager.outputs if name in names[path]]
+        output = None
+        if started and outputs:
+            output = output_dir / f"{path.stem}_unwrapped.obj"
+            export_objects(outputs, output, True)
+        results.append(_result(path, output, started, runner, names[path]))
+    return results
+
+
+def _result(path, output, started, runner, names):
+    """Summary entry of one input file."""
+    unwrapped = []
+    failed = []
+    if started:
+        unwrapped = [n for n, _ in manager.outputs if names is None or n in names]
+        failed = [
+            {"object": n, "reason": reason}
+            for n, reason in manager.failures
+            if names is None or n in names
+        ]
+
+    if not started:
+        status = "error"
+    elif failed and unwrapped:
+        status = "partial"
+    elif failed:
+        status = "failed"
+    else:
+        status = "done"
+    return {
+        "input": str(path),
+        "output": None if output is None else str(output),
+        "status": status,
+        "unwrapped": unwrapped,
+        "failed": failed,
+        "messages": runner.messages,
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="blender -b -P batch.py --",
+        description="Unwrap .blend and .obj files with UVgami in background mode",
+    )
+    parser.add_argument("inputs", nargs="+", type=pathlib.Path)
+    parser.add_argument(
+        "--settings",
+        type=pathlib.Path,
+        help="JSON file with UVgami settings, the same names as in the add-on",
+    )
+    parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=pathlib.Path("uvgami_output"),
+        help="Folder for the unwrapped files and the summary",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Entry point, blender's own arguments are before "--"."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+    args = parse_args(argv)
+    settings = load_settings(args.settings)
+    # blender needs absolute paths to save files
+    args.output = args.output.resolve()
+    args.output.mkdir(parents=True, exist_ok=True)
+
+    start_time = time.perf_counter()
+    results = []
+    obj_paths = []
+    # each run of the manager starts a new list
+    telemetry_records = []
+    for path in args.inputs:
+        path = path.resolve()
+        suffix = path.suffix.lower()
+        if not path.is_file() or suffix not in (".blend", ".obj"):
+            results.append(
+                {"input": str(path), "status": "error", "messages": ["Invalid input"]}
+            )
+        elif suffix == ".obj":
+            obj_paths.append(path)
+        else:
+            input_start = time.perf_counter()
+            results.extend(run_blend(path, settings, args.output))
+            results[-1]["time"] = time.perf_counter() - input_start
+            telemetry_records.extend(manager.telemetry)
+            manager.telemetry.clear()
+
+    if obj_paths:
+        input_start = time.perf_counter()
+        obj_results = run_objs(obj_paths, settings, args.output)
+        for result in obj_results:
+            # the obj files are unwrapped together
+            result["time"] = time.perf_counter() - input_start
+        results.extend(obj_results)
+        telemetry_records.extend(manager.telemetry)
+
+    summary = {
+        "settings": settings,
+        "time": time.perf_counter() - start_time,
+        "inputs": results,
+    }
+    with (args.output / "summary.json").open("w") as f:
+        json.dump(summary, f, indent=2)
+    if telemetry_records:
+        telemetry.export(args.output / "telemetry.json", telemetry_records)
+
+    return 0 if all(r["status"] == "done" for r in results) else 1
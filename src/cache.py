@@ -0,0 +1,159 @@
+# Copyright (C) 2022 Daniel Boxer
+# See __init__.py and LICENSE for more information
+
+import hashlib
+import os
+import shutil
+
+import numpy
+
+from .utils.paths import get_extension_dir_path, get_preferences
+
+MB = 1024**2
+
+
+def hash_file(path, digest):
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(MB), b""):
+            digest.update(chunk)
+
+
+def fingerprint_mesh(obj, guide_path, use_uvs):
+    """Hash of the mesh that will be exported, independent of object names.
+
+    Loose parts get new names every time they are separated, so the exported
+    file can't be hashed directly.
+    """
+    mesh = obj.data
+    digest = hashlib.sha256()
+    # the exporter writes world space coordinates
+    matrix = numpy.array(obj.matrix_world, dtype=numpy.float64)
+    digest.update(matrix.tobytes())
+    for collection, attribute, count, dtype in (
+        (mesh.vertices, "co", 3, numpy.float32),
+        (mesh.edges, "vertices", 2, numpy.int32),
+        (mesh.polygons, "loop_total", 1, numpy.int32),
+        (mesh.loops, "vertex_index", 1, numpy.int32),
+    ):
+        data = numpy.empty(len(collection) * count, dtype=dtype)
+        collection.foreach_get(attribute, data)
+        digest.update(attribute.encode())
+        digest.update(data.tobytes())
+    if use_uvs and mesh.uv_layers.active is not None:
+        uvs = numpy.empty(len(mesh.loops) * 2, dtype=numpy.float32)
+        mesh.uv_layers.active.data.foreach_get("uv", uvs)
+        digest.update(b"uv")
+        digest.update(uvs.tobytes())
+    if guide_path is not None:
+        digest.update(b"weights")
+        hash_file(guide_path, digest)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Engine outputs on disk, keyed by everything that goes into the engine.
+
+    The key is a hash of the mesh fingerprint, the engine arguments and the
+    engine binary. A hit copies the stored output into the output folder so
+    the unwrap can finish without an engine. Loose parts of a join are cached
+    one by one, so after an edit only the changed parts are unwrapped again.
+    The least recently used files are removed when the cache gets too big.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        # engine hashes by path, size and modified time
+        self._engine_hashes = {}
+
+    @property
+    def folder(self):
+        folder = get_extension_dir_path() / "cache"
+        folder.mkdir(exist_ok=True)
+        return folder
+
+    @property
+    def is_enabled(self):
+        return get_preferences().cache_size > 0
+
+    def reset_counts(self):
+        self.hits = 0
+        self.misses = 0
+
+    def _engine_hash(self, engine_path):
+        stat = engine_path.stat()
+        engine_id = (str(engine_path), stat.st_size, stat.st_mtime_ns)
+        if engine_id not in self._engine_hashes:
+            digest = hashlib.sha256()
+            hash_file(engine_path, digest)
+            self._engine_hashes[engine_id] = digest.hexdigest()
+        return self._engine_hashes[engine_id]
+
+    def get_key(self, unwrap):
+        """Hash of the engine inputs, stored on the unwrap."""
+        if unwrap.cache_key is None:
+            digest = hashlib.sha256()
+            digest.update(unwrap.fingerprint.encode())
+            digest.update(" ".join(unwrap.get_engine_args()).encode())
+            digest.update(self._engine_hash(unwrap.get_engine_path()).encode())
+            unwrap.cache_key = digest.hexdigest()
+        return unwrap.cache_key
+
+    def restore(self, unwrap):
+        """Copy a cached output for the unwrap, returns True on a hit."""
+        if not self.is_enabled or unwrap.fingerprint is None:
+            return False
+        # a queued unwrap is checked again until it starts, count it once
+        is_first_check = unwrap.cache_key is None
+        cached = self.folder / f"{self.get_key(unwrap)}{unwrap.output_path.suffix}"
+        if not cached.is_file():
+            if is_first_check:
+                self.misses += 1
+            return False
+        try:
+            shutil.copyfile(cached, unwrap.output_path)
+            # the modified time is used for least recently used eviction
+            os.utime(cached)
+        except OSError:
+            return False
+        unwrap.is_cached = True
+        self.hits += 1
+        return True
+
+    def store(self, unwrap):
+        """Save the output of a finished unwrap."""
+        if (
+            not self.is_enabled
+            or unwrap.fingerprint is None
+            or unwrap.is_cached
+            or unwrap.is_stopped
+            or unwrap.won_by is not None
+        ):
+            # a stopped or raced unwrap didn't finish at its quality, don't reuse it
+            return
+        cached = self.folder / f"{self.get_key(unwrap)}{unwrap.output_path.suffix}"
+        # the cache is only an optimization, a full disk shouldn't fail the unwrap
+        try:
+            shutil.copyfile(unwrap.output_path, cached)
+            self.evict()
+        except OSError as e:
+            print(f"UVgami: Could not cache result: {e}")
+
+    def evict(self):
+        """Remove the least recently used files until the cache fits."""
+        max_size = get_preferences().cache_size * MB
+        files = [(f.stat(), f) for f in self.folder.iterdir() if f.is_file()]
+        size = sum(stat.st_size for stat, _ in files)
+        for stat, f in sorted(files, key=lambda item: item[0].st_mtime):
+            if size <= max_size:
+                break
+            f.unlink()
+            size -= stat.st_size
+
+    def clear(self):
+        for f in self.folder.iterdir():
+            if f.is_file():
+                f.unlink()
+
+
+cache = ResultCache()
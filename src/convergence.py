@@ -0,0 +1,41 @@
+# Copyright (C) 2022 Daniel Boxer
+# See __init__.py and LICENSE for more information
+
+import collections
+import time
+
+
+class PlateauDetector:
+    """Find when an unwrap has stopped getting better.
+
+    Keeps the progress samples of the last window, the share of faces with
+    low stretching and the share with high stretching. When neither has
+    improved by more than epsilon since the sample a full window ago, the
+    unwrap is on a plateau and can be stopped. Engines that report rarely
+    are compared to their previous report if that is older than the window.
+    """
+
+    def __init__(self, window, epsilon):
+        # seconds and a fraction of the faces
+        self.window = window
+        self.epsilon = epsilon
+        self._samples = collections.deque()
+
+    def reset(self):
+        """Forget the samples, used when the engine was paused."""
+        self._samples.clear()
+
+    def add(self, progress, now=None):
+        """Add a progress sample, returns True if the unwrap is on a plateau."""
+        if now is None:
+            now = time.monotonic()
+        low, _, high = progress
+        self._samples.append((now, low, high))
+
+        # keep one sample that is at least a window old as the reference
+        while len(self._samples) > 1 and self._samples[1][0] <= now - self.window:
+            self._samples.popleft()
+        start, start_low, start_high = self._samples[0]
+        if now - start < self.window:
+            return False
+        return low - start_low < self.epsilon and start_high - high < self.epsilon
@@ -0,0 +1,181 @@
+# Copyright (C) 2022 Daniel Boxer
+# See __init__.py and LICENSE for more information
+
+import json
+import math
+
+import numpy
+
+from .scheduler import relative_cost
+from .utils.paths import get_extension_dir_path
+
+# runs kept for the model, older ones are dropped
+MAX_RECORDS = 1000
+# runs needed before the full model is used
+MIN_FIT_RECORDS = 20
+# runs that ended with less progress than this are left out of the model
+MIN_FIT_PROGRESS = 0.5
+# keeps the fit stable when a feature hardly changes, like the quality
+RIDGE = 1e-3
+
+
+class RuntimeHistory:
+    """Runtimes of finished unwraps, used to predict how long new ones take.
+
+    Every unwrap that ran an engine appends a line to a JSON lines file in
+    the extension folder. With enough runs, log runtime is fitted to log face
+    count, the vertex to face ratio, the quality and the seam restrictions by
+    least squares. Before that, the relative cost estimate of the scheduler
+    is scaled by the median ratio of measured runtime to cost. Stopped runs
+    and runs with little progress are kept in the file but not fitted, their
+    runtime says little about a full unwrap.
+    """
+
+    def __init__(self):
+        self._records = None
+        self._model = None
+        # keyed by id, so finished unwraps aren't kept alive by the cache
+        self._predictions = {}
+
+    @property
+    def path(self):
+        return get_extension_dir_path() / "history.jsonl"
+
+    @property
+    def records(self):
+        if self._records is None:
+            self._records = self._load()
+        return self._records
+
+    def _load(self):
+        if not self.path.is_file():
+            return []
+        records = []
+        with self.path.open() as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        if len(records) > MAX_RECORDS * 2:
+            # compact the file, it's only appended to otherwise
+            records = records[-MAX_RECORDS:]
+            with self.path.open("w") as f:
+                f.writelines(json.dumps(r) + "\n" for r in records)
+        return records[-MAX_RECORDS:]
+
+    def add(self, unwrap, runtime):
+        """Record a finished unwrap that ran for runtime seconds."""
+        record = {
+            "faces": unwrap.face_count,
+            "vertices": unwrap.vertex_count,
+            "quality": unwrap.quality,
+            "seam_weight": unwrap.seam_weight,
+            "guided": unwrap.guide_path is not None,
+            "runtime": runtime,
+            "progress": unwrap.progress[0],
+            "stopped": unwrap.is_stopped,
+        }
+        self.records.append(record)
+        del self.records[:-MAX_RECORDS]
+        self._model = None
+        self._predictions.clear()
+        # the history is only used for estimates, it can't fail an unwrap
+        try:
+            with self.path.open("a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"UVgami: Could not save runtime history: {e}")
+
+    def clear(self):
+        self._records = []
+        self._model = None
+        self._predictions.clear()
+        if self.path.is_file():
+            self.path.unlink()
+
+    def predict(self, unwrap):
+        """Predicted runtime of an unwrap in seconds, None without history."""
+        key = id(unwrap)
+        if key not in self._predictions:
+            self._predictions[key] = self._predict(
+                unwrap.face_count,
+                unwrap.vertex_count,
+                unwrap.quality,
+                unwrap.seam_weight if unwrap.guide_path is not None else None,
+            )
+        return self._predictions[key]
+
+    def forget(self, unwrap):
+        """Drop the prediction of an unwrap that's done."""
+        self._predictions.pop(id(unwrap), None)
+
+    def _predict(self, faces, vertices, quality, seam_weight):
+        if self._model is None:
+            self._model = self._fit()
+        kind, values = self._model
+        if kind is None:
+            return None
+        if kind == "ratio":
+            return values * relative_cost(faces, quality, seam_weight)
+        return math.exp(_features(faces, vertices, quality, seam_weight) @ values)
+
+    def _fit(self):
+        records = [r for r in self.records if _is_complete(r)]
+        if not records:
+            return None, None
+        if len(records) < MIN_FIT_RECORDS:
+            ratios = [
+                r["runtime"] / relative_cost(r["faces"], r["quality"], _seam_weight(r))
+                for r in records
+            ]
+            return "ratio", float(numpy.median(ratios))
+
+        x = numpy.array(
+            [
+                _features(r["faces"], r["vertices"], r["quality"], _seam_weight(r))
+                for r in records
+            ]
+        )
+        y = numpy.log([max(r["runtime"], 0.1) for r in records])
+        # ridge regression, solved with the normal equations
+        a = x.T @ x + RIDGE * numpy.eye(x.shape[1])
+        return "fit", numpy.linalg.solve(a, x.T @ y)
+
+
+def _is_complete(record):
+    return not record["stopped"] and record["progress"] >= MIN_FIT_PROGRESS
+
+
+def _seam_weight(record):
+    return record["seam_weight"] if record["guided"] else None
+
+
+def _features(faces, vertices, quality, seam_weight):
+    faces = max(faces, 1)
+    return numpy.array(
+        (
+            1.0,
+            math.log(faces),
+            math.log(max(vertices, 1) / faces),
+            quality == "MEDIUM",
+            quality == "LOW",
+            seam_weight is not None,
+            seam_weight or 0,
+        ),
+        dtype=numpy.float64,
+    )
+
+
+def format_duration(seconds):
+    """Short duration like 45s, 12m or 1h 5m."""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes}m {seconds % 60}s" if minutes < 10 else f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60}m"
+
+
+history = RuntimeHistory()
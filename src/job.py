@@ -1,12 +1,12 @@
 # Copyright (C) 2022 Daniel Boxer
 # See __init__.py and LICENSE for more information
 
-import re
-
 import bmesh
 import bpy
+import numpy
 
 from .logger import logger
+from .utils.io import read_mesh, write_mesh
 from .utils.mesh import check_exists, new_bmesh, set_bmesh
 
 
@@ -123,88 +123,82 @@ class Preserve(Job):
 class Join(Job):
     def __init__(self, count):
         super().__init__(count)
+        # arrays of the finished parts, read when each part finishes
+        # so only the merge is left when the last one does
+        self._parts = {}
 
-    def finish(self, unwrap):
-        paths = [u.path.parents[1] / "output" / u.path.name for u in self.unwrapped]
-        edge_path = unwrap.edge_path
+    def add(self, unwrap):
+        """Add a finished part and read its output."""
+        self.unwrapped.append(unwrap)
+        self._parts[unwrap] = read_mesh(unwrap.output_path)
 
-        # set the current path to the first obj in the job
-        # this is the file that will be imported
-        path = paths[0]
-
-        prev_v = 0
-        prev_vt = 0
-        # go through first obj file to get the starting size
-        with paths[0].open() as f:
-            for line in f:
-                if line.startswith("v "):
-                    prev_v += 1
-                elif line.startswith("vt "):
-                    prev_vt += 1
-                elif line.startswith("f "):
-                    break
-
-        new_v = prev_v
-        new_vt = prev_vt
-        with paths[0].open("a") as f:
-            # since there are multiple obj files combined, the size of the
-            # previous ones must be added to the index numbers of the next
-            for obj_path in paths[1:]:
-                with obj_path.open() as f2:
-                    for line in f2:
-                        new_line = line
-                        if line.startswith("v "):
-                            new_v += 1
-                        elif line.startswith("vt "):
-                            new_vt += 1
-                        elif line.startswith("f "):
-                            line = line[2:]
-                            line = re.split(r"[ /]", line)
-                            new_line = "f "
-
-                            count = 0
-                            for num in line:
-                                count += 1
-                                if count == 1:
-                                    new_line += str(int(num) + prev_v)
-                                    new_line += "/"
-                                elif count == 2:
-                                    new_line += str(int(num) + prev_vt)
-                                    new_line += " "
-                                    count = 0
-                            new_line += "\n"
-
-                        f.write(new_line)
-                    prev_v = new_v
-                    prev_vt = new_vt
+    def finish(self, unwrap):
+        unwraps = self.unwrapped
+        parts = []
+        for u in unwraps:
+            # parts of a resumed batch weren't read when they finished
+            if u not in self._parts:
+                self._parts[u] = read_mesh(u.output_path)
+            parts.append(self._parts.pop(u))
+        vertices, uvs, faces, uv_faces = zip(*parts)
+
+        # the merged mesh is the file that will be imported, it's written
+        # next to the outputs so a crash before the import leaves the parts
+        # as they were for the resumed batch to join again
+        path = _joined_path(unwraps[0].output_path)
+        # since there are multiple outputs combined, the size of the
+        # previous ones must be added to the index numbers of the next
+        write_mesh(
+            path,
+            numpy.concatenate(vertices),
+            numpy.concatenate(uvs),
+            _offset(faces, [len(v) for v in vertices]),
+            _offset(uv_faces, [len(uv) for uv in uvs]),
+        )
 
+        edge_path = unwrap.edge_path
         added_edges = []
         if unwrap.preserve_job is not None:
             # combine all added edges in the group
             v_count = 0
-            for e_idx, edges in enumerate([u.added_edges for u in self.unwrapped]):
-                for v1, v2 in edges:
+            for u in unwraps:
+                for v1, v2 in u.added_edges:
                     added_edges.append((v1 + v_count, v2 + v_count))
-                v_count += self.unwrapped[e_idx].vertex_count
+                v_count += u.vertex_count
 
             # combine all edge files
-            unwraps = self.unwrapped
-            edge_path = unwraps[0].edge_path
-            v_count = unwraps[0].vertex_count
-            e_paths = [u.edge_path for u in unwraps]
-            with e_paths[0].open("a") as f:
-                for e_idx, e_path in enumerate(e_paths[1:], 1):
-                    with e_path.open() as f2:
-                        for line in f2:
-                            line = line.split()
-                            f.write(
-                                f"{int(line[0]) + v_count} {int(line[1]) + v_count}\n"
-                            )
-                    v_count += unwraps[e_idx].vertex_count
+            edge_path = _joined_path(unwraps[0].edge_path)
+            edges = [_read_edges(u.edge_path) for u in unwraps]
+            edges = _offset(edges, [u.vertex_count for u in unwraps])
+            with edge_path.open("w") as f:
+                f.write(_format_edges(edges))
 
         return (path, edge_path, added_edges)
 
 
+def _joined_path(path):
+    return path.with_name(f"{path.stem}_joined{path.suffix}")
+
+
+def _offset(indices, sizes):
+    """Concatenate index arrays, adding the sizes of the arrays before each."""
+    offsets = numpy.cumsum([0] + sizes[:-1])
+    counts = [len(i) for i in indices]
+    return numpy.concatenate(indices) + numpy.repeat(offsets, counts)[:, None]
+
+
+def _read_edges(path):
+    # line format: vertex index 1, vertex index 2
+    if path is None or not path.is_file():
+        return numpy.empty((0, 2), numpy.int64)
+    text = path.read_text()
+    return numpy.fromstring(text, dtype=numpy.int64, sep=" ").reshape(-1, 2)
+
+
+def _format_edges(edges):
+    return ("%d %d\n" * len(edges)) % tuple(edges.ravel().tolist())
+
+
 class Cleanup(Job):
     def __init__(self, count, action):
         super().__init__(count)
@@ -0,0 +1,223 @@
+# Copyright (C) 2022 Daniel Boxer
+# See __init__.py and LICENSE for more information
+
+import json
+
+import bpy
+import mathutils
+import numpy
+
+from .job import Cleanup, Join, Preserve, Symmetrise
+from .utils.paths import get_extension_dir_path
+
+JOB_TYPES = {
+    "Preserve": Preserve,
+    "Join": Join,
+    "Cleanup": Cleanup,
+    "Symmetrise": Symmetrise,
+}
+
+
+class Journal:
+    """Append only log of the current batch, used to resume it after a crash.
+
+    Every line is a JSON event. An unwrap is recorded with everything needed
+    to make it again when it is queued, then each change of its state is
+    appended. Lines are flushed as they are written, so a crash loses at most
+    the last line, which is ignored when reading. Per vertex and per face
+    data is saved to a file next to the unwrap's input instead of the line.
+    """
+
+    def __init__(self):
+        self._file = None
+        self._job_ids = {}
+
+    @property
+    def path(self):
+        return get_extension_dir_path() / "journal.jsonl"
+
+    def exists(self):
+        return self.path.is_file()
+
+    def _write(self, event):
+        if self._file is None:
+            self._file = self.path.open("a")
+            begin = {"event": "begin", "blend": bpy.data.filepath}
+            self._file.write(json.dumps(begin) + "\n")
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+
+    def _job_id(self, job, inputs):
+        if job is None:
+            return None
+        if job not in self._job_ids:
+            self._job_ids[job] = len(self._job_ids)
+            event = {
+                "event": "job",
+                "id": self._job_ids[job],
+                "type": type(job).__name__,
+            }
+            if isinstance(job, Cleanup):
+                event["action"] = job.action
+                event["input"] = inputs[job].name if job in inputs else None
+            elif isinstance(job, Symmetrise):
+                axes = zip("XYZ", (job.x, job.y, job.z))
+                event["axes"] = [axis for axis, is_used in axes if is_used]
+                event["center"] = list(job.center)
+                event["overlap"] = job.overlap
+            self._write(event)
+        return self._job_ids[job]
+
+    def add(self, unwrap, inputs):
+        """Record a queued unwrap, inputs are the cleanup job input objects."""
+        jobs = (
+            unwrap.preserve_job,
+            unwrap.join_job,
+            unwrap.cleanup_job,
+            unwrap.symmetrize_job,
+        )
+        self._write(
+            {
+                "event": "add",
+                "id": unwrap.path.name,
+                "name": unwrap.name,
+                "input_name": unwrap.input_name,
+                "path": str(unwrap.path),
+                "guide_path": _optional_str(unwrap.guide_path),
+                "edge_path": _optional_str(unwrap.edge_path),
+                "jobs": [self._job_id(job, inputs) for job in jobs],
+                "origin": list(unwrap.origin),
+                "materials": unwrap.materials,
+                "added_edges": unwrap.added_edges,
+                "vertex_count": unwrap.vertex_count,
+                "face_count": unwrap.face_count,
+                "arrays": str(_save_arrays(unwrap)),
+                "shade_smooth": unwrap.shade_smooth,
+                "auto_smooth": unwrap.auto_smooth,
+                "merge_cuts": unwrap.merge_cuts,
+                "fingerprint": unwrap.fingerprint,
+                "quality": unwrap.quality,
+                "seam_weight": unwrap.seam_weight,
+                "is_cached": unwrap.is_cached,
+                "source": None if unwrap.source is None else unwrap.source.path.name,
+            }
+        )
+
+    def set_state(self, unwrap, state):
+        """state is one of "running", "finished", "failed" or "cancelled"."""
+        if self._file is not None:
+            self._write({"event": "state", "id": unwrap.path.name, "state": state})
+
+    def set_imported(self, unwrap, path, edge_path, added_edges, output):
+        """Record the file an output was imported from, after joins and rerouting."""
+        if self._file is None:
+            return
+        members = [unwrap]
+        if unwrap.join_job is not None and unwrap.join_job.unwrapped:
+            members = unwrap.join_job.unwrapped
+        self._write(
+            {
+                "event": "imported",
+                "id": unwrap.path.name,
+                "members": [u.path.name for u in members],
+                "path": str(path),
+                "edge_path": _optional_str(edge_path),
+                "added_edges": added_edges,
+                "output": output.name,
+            }
+        )
+
+    def load(self):
+        """Read the journal, returns the blend path, jobs and unwrap records.
+
+        The records are in queue order, each with its latest "state" and the
+        "imported" event of the unwrap that imported it, if any.
+        """
+        blend = None
+        jobs = {}
+        records = {}
+        with self.path.open() as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # last line of a crash
+                    continue
+                kind = event.pop("event")
+                if kind == "begin":
+                    blend = event["blend"]
+                elif kind == "job":
+                    jobs[event["id"]] = event
+                elif kind == "add":
+                    event["state"] = "queued"
+                    event["imported"] = None
+                    records[event["id"]] = event
+                elif kind == "state" and event["id"] in records:
+                    records[event["id"]]["state"] = event["state"]
+                elif kind == "imported":
+                    for member in event["members"]:
+                        if member in records:
+                            records[member]["state"] = "imported"
+                    if event["id"] in records:
+                        records[event["id"]]["imported"] = event
+        return blend, jobs, records
+
+    def clear(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._job_ids.clear()
+        if self.exists():
+            self.path.unlink()
+
+
+def make_job(data, count):
+    """Make a job from its journal event."""
+    job_type = JOB_TYPES[data["type"]]
+    if job_type is Cleanup:
+        return Cleanup(count, data["action"])
+    if job_type is Symmetrise:
+        center = mathutils.Vector(data["center"])
+        return Symmetrise(count, set(data["axes"]), center, data["overlap"])
+    return job_type(count)
+
+
+def load_arrays(path):
+    """Read the arrays of a journaled unwrap.
+
+    Returns the material indices, the vertex groups and the coords, which
+    are None if they weren't saved.
+    """
+    with numpy.load(path) as data:
+        material_indices = data["material_indices"].tolist()
+        vertex_groups = {}
+        for i, name in enumerate(data["group_names"].tolist()):
+            indices = data[f"group_{i}_indices"].tolist()
+            weights = data[f"group_{i}_weights"].tolist()
+            vertex_groups[name] = dict(zip(indices, weights))
+        coords = data["coords"] if "coords" in data else None
+    return material_indices, vertex_groups, coords
+
+
+def _save_arrays(unwrap):
+    path = unwrap.path.with_suffix(".npz")
+    arrays = {
+        "material_indices": numpy.array(unwrap.material_indices, dtype=numpy.int32),
+        "group_names": numpy.array(list(unwrap.vertex_groups), dtype=str),
+    }
+    for i, weights in enumerate(unwrap.vertex_groups.values()):
+        arrays[f"group_{i}_indices"] = numpy.array(list(weights), dtype=numpy.int32)
+        arrays[f"group_{i}_weights"] = numpy.array(
+            list(weights.values()), dtype=numpy.float64
+        )
+    if unwrap.coords is not None:
+        arrays["coords"] = unwrap.coords
+    numpy.savez(path, **arrays)
+    return path
+
+
+def _optional_str(path):
+    return None if path is None else str(path)
+
+
+journal = Journal()
@@ -12,14 +12,24 @@ class Info:
         self.errors = []
         self.status = "In Progress"
         self.objects = []
+        self.memory = None
+        self.cache = None
 
     def get_info(self):
+        memory = []
+        if self.memory is not None:
+            peak, headroom = self.memory
+            memory.append(f"Memory: {peak:.1f} GB peak, {headroom:.1f} GB headroom")
+        if self.cache is not None:
+            hits, misses = self.cache
+            memory.append(f"Cache: {hits} hits, {misses} misses")
         return (
             [
                 f"Status: {self.status}",
                 f"Time: {self.time:.2f}s",
-                "Objects:",
             ]
+            + memory
+            + ["Objects:"]
             + self.objects
             + ["Errors:"]
             + self.errors
@@ -69,5 +79,13 @@ class Logger:
         if get_preferences().show_info:
             self.get_latest().time = time.perf_counter() - self.start_time
 
+    def update_memory(self, peak, headroom):
+        if get_preferences().show_info:
+            self.get_latest().memory = (peak, headroom)
+
+    def update_cache(self, hits, misses):
+        if get_preferences().show_info and hits + misses > 0:
+            self.get_latest().cache = (hits, misses)
+
 
 logger = Logger()
@@ -2,54 +2,164 @@
 # See __init__.py and LICENSE for more information
 
 import functools
+import queue
+import shutil
+import threading
 import time
 import traceback
-from collections import deque
 
 import bmesh
 import bpy
 import numpy
 
+from .cache import cache
 from .job import Join
+from .history import history
+from .journal import journal
 from .logger import logger
 from .ops.grid import add_grid, make_grid_img, make_grid_mat
 from .ops.uv import pack, show_seams
 from .progress_bar import progress_bar
+from .reader import OUTPUT_ERROR
 from .reroute_seams import reroute_seams
+from .scheduler import (
+    ENGINE_BASE_MEMORY,
+    RACE_QUALITIES,
+    ConcurrencyController,
+    UnwrapQueue,
+    estimate_cost,
+    estimate_memory,
+)
 from .utils.geometry import set_origin
-from .utils.io import import_obj, print_stdin
+from .utils.io import import_mesh, print_stdin
 from .utils.mesh import (
     check_collection,
     check_exists,
     edit_restore,
     move_to_collection,
     new_bmesh,
-    set_active_any,
     set_bmesh,
 )
-from .utils.paths import get_extension_dir_path, get_preferences
+from .utils.paths import get_preferences, get_work_dir_path
+from .utils.system import get_memory_info
 from .utils.ui import popup, switch_shading
 
+# dispatch timer intervals in seconds
+# the timer runs fast while unwraps are finishing or being viewed,
+# slower while only progress is arriving, and backs off when idle
+BUSY_INTERVAL = 0.1
+PROGRESS_INTERVAL = 0.5
+IDLE_INTERVAL = 2.0
+
+# automatic timeouts are the predicted runtime times this, but at least a minute
+TIMEOUT_FACTOR = 3
+MIN_TIMEOUT = 60
+# seconds an unwrap gets at least from the time budget
+MIN_BUDGET_SHARE = 10
+
+GB = 1024**3
+# fraction of total memory kept free for blender when the budget is automatic
+MEMORY_RESERVE = 0.1
+
 
 class UnwrapManager:
     def __init__(self):
-        self._queue = deque()
+        self._queue = UnwrapQueue()
         self._running = []
         self._pack_output_objects = []
         self.input = {}
         self.engine_path = None
         self.is_active = False
         self.is_viewer_active = False
+        self.telemetry = []
+        # end of the time budget of the batch, None if there is no budget
+        self.deadline = None
         self._dispatch_handle = None
+        # events pushed by the output reader
+        self._events = queue.SimpleQueue()
+        # set when an event is posted, run_blocking waits on it
+        self._has_events = threading.Event()
+        self._interval = BUSY_INTERVAL
+        # measured engine memory per face, replaces the default estimate
+        self._memory_per_face = None
+        self._concurrency = ConcurrencyController()
 
     @property
     def active(self):
         """All unwraps (running and queued)"""
-        return self._running + list(self._queue)
+        # racers are part of the unwrap they race, they aren't shown
+        unwraps = [u for u in self._running if u.race_of is None] + list(self._queue)
+        # the ui uses index ranges, so parts of a join job must be next to each other
+        groups = {}
+        for unwrap in unwraps:
+            groups.setdefault(unwrap.join_job or unwrap, len(groups))
+        return sorted(unwraps, key=lambda u: groups[u.join_job or u])
 
     def add(self, unwrap):
         """Add an unwrap to the queue."""
-        self._queue.append(unwrap)
+        journal.add(unwrap, self.input)
+        if unwrap.source is not None:
+            # copies wait for their source without using a slot
+            self._running.append(unwrap)
+        else:
+            self._queue.append(unwrap)
+
+    def post_event(self, unwrap, kind, data=None):
+        """Thread safe, called from the output reader thread.
+
+        kind is one of "progress", "snapshot" or "exited".
+        """
+        self._events.put((unwrap, kind, data))
+        self._has_events.set()
+
+    def _drain_events(self):
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def wake(self):
+        """Run the dispatch timer as soon as possible.
+
+        Used by operators that change the state of the batch, so they don't
+        have to wait for an idle interval to pass.
+        """
+        self._interval = BUSY_INTERVAL
+        if self._dispatch_handle is not None and bpy.app.timers.is_registered(
+            self._dispatch_handle
+        ):
+            bpy.app.timers.unregister(self._dispatch_handle)
+            bpy.app.timers.register(self._dispatch_handle, first_interval=0)
+
+    def get_remaining(self, unwrap):
+        """Predicted seconds until an unwrap finishes, None without history."""
+        if unwrap.is_cached or unwrap.source is not None:
+            return 0
+        predicted = history.predict(unwrap)
+        if predicted is None:
+            return None
+        return max(predicted - unwrap.get_runtime(), 0)
+
+    def get_batch_remaining(self):
+        """Predicted seconds until all unwraps finish, None without history."""
+        remaining = [self.get_remaining(unwrap) for unwrap in self.active]
+        if not remaining or None in remaining:
+            return None
+        # the work is shared by the engines, but the longest can't be shared
+        engines = max(sum(u.process is not None for u in self._running), 1)
+        return max(max(remaining), sum(remaining) / engines)
+
+    def _get_timeout(self, unwrap, props):
+        """Seconds an unwrap can run for, None if there is no timeout."""
+        if props.auto_timeout:
+            predicted = history.predict(unwrap)
+            if predicted is not None:
+                return max(predicted * TIMEOUT_FACTOR, MIN_TIMEOUT)
+        if props.unwrap_timeout > 0:
+            return props.unwrap_timeout * 60
+        return None
 
     def remove_unwrap(self, unwrap):
         """Remove an unwrap from running or queue."""
@@ -59,11 +169,31 @@ class UnwrapManager:
             self._queue.remove(unwrap)
 
     def start(self):
+        self._begin()
+        # register central dispatch timer
+        self._dispatch_handle = functools.partial(self._dispatch)
+        bpy.app.timers.register(self._dispatch_handle)
+
+    def run_blocking(self):
+        """Run the queued unwraps on the calling thread until all are done.
+
+        Used in background mode, where there is no event loop for the timer.
+        """
+        self._begin()
+        interval = BUSY_INTERVAL
+        while interval is not None:
+            # wake up as soon as an unwrap sends something
+            self._has_events.wait(interval)
+            # cleared before draining, so an event posted during dispatch
+            # wakes the next wait
+            self._has_events.clear()
+            interval = self._dispatch()
+
+    def _begin(self):
         self.starting_count = len(self._queue) + len(self._running)
-        # fill initial slots from queue
-        self._fill_slots()
-        if get_preferences().show_progress_bar:
-            progress_bar.start()
+        self.peak_memory = 0
+        self.min_headroom = None
+        self._concurrency.reset()
         self.is_active = True
         self.found_invalid_objects = False
         self.finished_count = 0
@@ -72,47 +202,247 @@ class UnwrapManager:
         self.license_error = None
         self.current_viewer = None
         self.is_viewer_active = False
-        self.exit_viewer = False
         self._pack_output_objects = []
-        # register central dispatch timer
-        self._dispatch_handle = functools.partial(self._dispatch)
-        bpy.app.timers.register(self._dispatch_handle)
+        self._interval = BUSY_INTERVAL
+        # results of the batch, as (input name, output object or reason)
+        self.outputs = []
+        self.failures = []
+        # engine telemetry of the finished unwraps, if it's turned on
+        self.telemetry = []
+        budget = bpy.context.scene.uvgami.time_budget
+        self.deadline = time.monotonic() + budget * 60 if budget > 0 else None
+        # fill initial slots from queue
+        self._fill_slots()
+        if get_preferences().show_progress_bar and not bpy.app.background:
+            progress_bar.start()
 
     def _fill_slots(self):
         """Start queued unwraps up to the concurrency limit."""
         props = bpy.context.scene.uvgami
-        max_concurrent = props.max_cores if props.concurrent else 1
-        while len(self._running) < max_concurrent and self._queue:
-            unwrap = self._queue.popleft()
+        if not props.concurrent:
+            max_concurrent = 1
+        elif props.auto_cores:
+            max_concurrent = self._concurrency.update(self._running)
+        else:
+            max_concurrent = props.max_cores
+        while self._queue:
+            unwrap = self._queue.peek()
+            if unwrap is None:
+                # the rest of the queue is paused
+                break
+            if unwrap.is_cached or cache.restore(unwrap):
+                # cached results don't need an engine, so they don't use a slot
+                self._queue.popleft()
+                unwrap.start_cached()
+                self._running.append(unwrap)
+                continue
+            # paused engines don't use a core
+            engines = [
+                u for u in self._running if u.process is not None and not u.is_paused
+            ]
+            if len(engines) >= max_concurrent or not self._fits_in_memory(unwrap):
+                break
+            self._queue.popleft()
             unwrap.start_unwrap()
+            if self.deadline is not None:
+                self._assign_budget(unwrap, max_concurrent)
             self._running.append(unwrap)
+        if props.race and self._queue.peek() is None:
+            self._start_racers(max_concurrent, props.race_target / 100)
+        logger.update_cache(cache.hits, cache.misses)
+
+    def _start_racers(self, slots, target):
+        """Race running unwraps at faster qualities on the slots left over.
+
+        The first result with at least target of the faces at low stretching
+        is used, the rest are cancelled.
+        """
+        for unwrap in list(self._running):
+            if (
+                unwrap.process is None
+                or unwrap.race_of is not None
+                or unwrap.race_target is not None
+                or unwrap.is_paused
+                or unwrap.is_stopped
+            ):
+                continue
+            for quality in RACE_QUALITIES[unwrap.quality]:
+                engines = [
+                    u
+                    for u in self._running
+                    if u.process is not None and not u.is_paused
+                ]
+                if len(engines) >= slots or not self._fits_in_memory(unwrap):
+                    return
+                racer = unwrap.make_racer(quality)
+                racer.start_unwrap()
+                racer.budget_deadline = unwrap.budget_deadline
+                unwrap.race_target = target
+                self._running.append(racer)
+
+    def _finish_race(self, racer, ret_code, completed):
+        """Use the result of a racer that exited if it's good enough."""
+        unwrap = racer.race_of
+        if (
+            ret_code == 0
+            and racer.output_path.is_file()
+            and racer.progress[0] >= unwrap.race_target
+            and unwrap in self._running
+            and unwrap not in completed
+        ):
+            unwrap.stop_process()
+            shutil.copyfile(racer.output_path, unwrap.output_path)
+            unwrap.won_by = racer.quality
+            unwrap.progress = racer.progress
+            # the runtime is of the racer's quality, not the unwrap's
+            history.add(racer, racer.get_runtime())
+            completed.append(unwrap)
+        self._drop_racer(racer)
+
+    def _drop_racer(self, racer):
+        racer.stop_process()
+        self.remove_unwrap(racer)
+        racer.race_of.racers.remove(racer)
+        racer.cleanup()
+
+    def _cancel_racers(self, unwrap):
+        for racer in list(unwrap.racers):
+            self._drop_racer(racer)
+
+    def _assign_budget(self, unwrap, slots):
+        """Give a started unwrap its share of the time left in the budget.
+
+        The engine time left on all slots, less what the running unwraps were
+        already given, is shared by the unwrap and the queue by estimated cost.
+        """
+        now = time.monotonic()
+        left = self.deadline - now
+        given = sum(
+            min(max(u.budget_deadline - now, 0), left)
+            for u in self._running
+            if u.budget_deadline is not None
+        )
+        capacity = max(left * slots - given, 0)
+        cost = estimate_cost(unwrap)
+        queued = sum(self._queue.cost(u) for u in self._queue if not u.is_cached)
+        share = capacity * cost / (cost + queued)
+        # an unwrap can't use more than the time left, however few are queued
+        share = min(share, left)
+        unwrap.budget_deadline = now + max(share, MIN_BUDGET_SHARE)
+
+    def _fits_in_memory(self, unwrap):
+        """Check if an unwrap can start without going over the memory budget."""
+        # always run at least one unwrap, otherwise a big mesh would never start
+        if not any(u.process is not None and not u.is_paused for u in self._running):
+            return True
+        headroom = self._memory_headroom()
+        if headroom is None:
+            return True
+        return estimate_memory(unwrap, self._memory_per_face) <= headroom
+
+    def _memory_headroom(self):
+        """Memory left for new engines in bytes, None if it can't be known."""
+        budget = get_preferences().memory_budget
+        # paused engines still hold their memory
+        estimates = [
+            (u.rss or 0, estimate_memory(u, self._memory_per_face))
+            for u in self._running
+            if u.process is not None
+        ]
+        if budget > 0:
+            projected = sum(max(rss, estimate) for rss, estimate in estimates)
+            return budget * GB - projected
+
+        info = get_memory_info()
+        if info is None:
+            return None
+        total, available = info
+        # running engines are already using some of their memory,
+        # only the growth that is still expected needs to be reserved
+        growth = sum(max(estimate - rss, 0) for rss, estimate in estimates)
+        return available - growth - total * MEMORY_RESERVE
+
+    def _update_memory(self):
+        """Sample engine memory and report it in the info panel."""
+        total = 0
+        for unwrap in self._running:
+            unwrap.update_memory()
+            total += unwrap.rss or 0
+        self.peak_memory = max(self.peak_memory, total)
+        headroom = self._memory_headroom()
+        if headroom is None:
+            return
+        if self.min_headroom is None or headroom < self.min_headroom:
+            self.min_headroom = headroom
+        logger.update_memory(self.peak_memory / GB, self.min_headroom / GB)
+
+    def _learn_memory(self, unwrap):
+        """Use the measured peak of a finished unwrap for future estimates."""
+        # the memory of a wsl engine can't be read, only the bash process
+        if unwrap.peak_rss is None or unwrap.peak_rss < ENGINE_BASE_MEMORY:
+            return
+        per_face = (unwrap.peak_rss - ENGINE_BASE_MEMORY) / max(unwrap.face_count, 1)
+        self._memory_per_face = max(self._memory_per_face or 0, per_face)
 
     def _dispatch(self):
-        """Central dispatch timer that monitors all running unwraps."""
+        """Central dispatch timer that handles events from all running unwraps."""
         # guard against running after finish
         if not self.is_active:
             return None
 
         try:
             prefs = get_preferences()
+            props = bpy.context.scene.uvgami
             completed = []
             failed = []
 
-            for unwrap in list(self._running):
-                # update progress
+            events = self._drain_events()
+            races = []
+            progressed = set()
+            exited = {}
+            for unwrap, kind, data in events:
+                # events from cancelled or finished unwraps are ignored
+                if unwrap not in self._running:
+                    continue
+                if kind == "progress":
+                    progressed.add(unwrap)
+                elif kind == "exited":
+                    exited[unwrap] = data
+
+            for unwrap in progressed:
                 unwrap.update_progress()
 
                 # check early stop
-                early_stop = bpy.context.scene.uvgami.early_stop
+                early_stop = props.early_stop
                 if early_stop != 100 and unwrap.progress[0] >= early_stop / 100:
                     unwrap.is_stopped = True
+                # stop saves the result, so a plateau loses nothing
+                if unwrap.plateau is not None and unwrap.plateau.add(unwrap.progress):
+                    unwrap.is_stopped = True
+                # a racing unwrap is done once it's good enough
+                target = (unwrap.race_of or unwrap).race_target
+                if target is not None and unwrap.progress[0] >= target:
+                    unwrap.is_stopped = True
 
+            for unwrap in list(self._running):
                 # update viewer
                 if unwrap.viewing:
                     unwrap.update_viewer()
 
+                # the share of the time budget has run out, stop keeps the result
+                if (
+                    unwrap.budget_deadline is not None
+                    and not unwrap.is_stopped
+                    and time.monotonic() > unwrap.budget_deadline
+                ):
+                    unwrap.is_stopped = True
+
                 # if part of batch unwrap, hasn't started and stop button pressed
-                if unwrap.is_stopped:
+                # copies and cached results have no engine, they finish with
+                # their source
+                if unwrap.is_stopped and unwrap.process is not None:
+                    # a suspended engine can't read the stop command
+                    unwrap.resume()
                     print_stdin(unwrap.process, "stop")
                     # track when stop was first requested
                     if unwrap.stop_requested_at is None:
@@ -127,27 +457,41 @@ class UnwrapManager:
                         failed.append((unwrap, -3))
 
                 # check if unwrap has exceeded the timeout
-                timeout_minutes = bpy.context.scene.uvgami.unwrap_timeout
+                timeout = self._get_timeout(unwrap, props)
                 if (
-                    timeout_minutes > 0
-                    and hasattr(unwrap, "started_at")
-                    and time.monotonic() - unwrap.started_at > timeout_minutes * 60
+                    timeout is not None
+                    and unwrap.process is not None
+                    and not unwrap.is_paused
+                    and unwrap.get_runtime() > timeout
                 ):
                     unwrap.stop_process()
                     failed.append((unwrap, -2))
 
-                # check process status
-                ret_code = unwrap.process.poll()
-                if ret_code is not None:
-                    if ret_code == 0 and unwrap.output_path.is_file():
+                # check process status, the reader's event usually comes
+                # first, polling catches an exit it missed
+                if unwrap not in exited and unwrap.process is not None:
+                    ret_code = unwrap.process.poll()
+                    if ret_code is not None:
+                        exited[unwrap] = ret_code
+                if unwrap in exited:
+                    ret_code = exited[unwrap]
+                    if unwrap.race_of is not None:
+                        races.append((unwrap, ret_code))
+                    elif ret_code == 0 and unwrap.output_path.is_file():
                         completed.append(unwrap)
                     elif ret_code != 0:
                         failed.append((unwrap, ret_code))
 
             logger.update_time()
+            self._update_memory()
 
-            # update progress bar
-            self._update_progress_bar()
+            # the progress bar only changes when progress arrives or unwraps exit
+            if progressed or exited:
+                self._update_progress_bar()
+
+            for racer, ret_code in races:
+                if racer in self._running:
+                    self._finish_race(racer, ret_code, completed)
 
             # process completions (each isolated so one failure doesn't block others)
             for unwrap in completed:
@@ -166,6 +510,11 @@ class UnwrapManager:
 
             # process failures (each isolated)
             for unwrap, ret_code in failed:
+                # a racer that failed or timed out only drops out of the race
+                if unwrap.race_of is not None:
+                    if unwrap in self._running:
+                        self._drop_racer(unwrap)
+                    continue
                 try:
                     self._handle_failure(unwrap, ret_code)
                 except Exception:
@@ -193,11 +542,20 @@ class UnwrapManager:
             handle_error(e, "MIDDLE")
             return None
 
-        return 0.1
+        self._interval = self._next_interval(events)
+        return self._interval
+
+    def _next_interval(self, events):
+        """Run fast while events are arriving, back off when idle."""
+        if self.is_viewer_active or any(e[1] != "progress" for e in events):
+            return BUSY_INTERVAL
+        if events:
+            return PROGRESS_INTERVAL
+        return min(max(self._interval, BUSY_INTERVAL) * 2, IDLE_INTERVAL)
 
     def _update_progress_bar(self):
         """Update the overall progress bar."""
-        if not get_preferences().show_progress_bar:
+        if not progress_bar.is_active:
             return
 
         all_unwraps = self.active
@@ -217,6 +575,16 @@ class UnwrapManager:
         """Process a successfully completed unwrap."""
         if not invalid_pass:
             self.finished_count += 1
+            self._learn_memory(unwrap)
+            journal.set_state(unwrap, "finished")
+            self._cancel_racers(unwrap)
+            if not unwrap.is_cached and unwrap.source is None and unwrap.won_by is None:
+                history.add(unwrap, unwrap.get_runtime())
+            # store before joining, the join writes into the first output
+            cache.store(unwrap)
+            for copy in unwrap.copies:
+                if copy in self._running:
+                    copy.transfer_from(unwrap)
 
         path, edge_path, added_edges, is_import_ready = self._resolve_join(
             unwrap, invalid_pass
@@ -225,8 +593,6 @@ class UnwrapManager:
         if is_import_ready:
             self._import_and_finalize(unwrap, path, edge_path, added_edges)
 
-        self.exit_viewer = True
-
         if not invalid_pass:
             # remove from running and clean up files
             if unwrap in self._running:
@@ -242,7 +608,7 @@ class UnwrapManager:
 
         if unwrap.join_job is not None:
             if not invalid_pass:
-                unwrap.join_job.unwrapped.append(unwrap)
+                unwrap.join_job.add(unwrap)
             # get all paths of finished unwraps before joining
             if unwrap.join_job.is_completed() and unwrap.join_job.count > 1:
                 data = unwrap.join_job.finish(unwrap)
@@ -256,22 +622,27 @@ class UnwrapManager:
 
         return path, edge_path, added_edges, is_import_ready
 
-    def _import_and_finalize(self, unwrap, path, edge_path, added_edges):
+    def reimport(self, unwrap, path, edge_path, added_edges):
+        """Import an output again after a crash, the file is already joined.
+
+        Used when resuming a batch, after it was started.
+        """
+        self.finished_count += 1
+        self._import_and_finalize(unwrap, path, edge_path, added_edges, reroute=False)
+
+    def _import_and_finalize(self, unwrap, path, edge_path, added_edges, reroute=True):
         """Import the unwrapped OBJ and apply all post-processing."""
         props = bpy.context.scene.uvgami
 
         # reroute seams before importing
-        if unwrap.preserve_job is not None and props.maintain_mode == "FULL":
+        if (
+            reroute
+            and unwrap.preserve_job is not None
+            and props.maintain_mode == "FULL"
+        ):
             reroute_seams(path, edge_path)
 
-        old_active = bpy.context.view_layer.objects.active
-        if old_active is None:
-            old_active = set_active_any()
-        output = import_obj(path, f"{unwrap.input_name}_unwrapped")
-        # the new obj importer changes the active object
-        if bpy.app.version >= (3, 2, 0):
-            bpy.context.view_layer.objects.active = old_active
-
+        output = import_mesh(path, f"{unwrap.input_name}_unwrapped")
         set_origin(output, unwrap.origin)
 
         # set materials
@@ -335,6 +706,8 @@ class UnwrapManager:
         self._restore_vertex_groups(unwrap, output)
 
         logger.add_data("objects", unwrap.input_name)
+        self.outputs.append((unwrap.input_name, output))
+        journal.set_imported(unwrap, path, edge_path, added_edges, output)
 
         collection = check_collection("UVgami Unwrapped", bpy.context.scene.collection)
         move_to_collection(output, collection)
@@ -362,7 +735,7 @@ class UnwrapManager:
                 if v_idx < len(output.data.vertices):
                     new_group.add([v_idx], weight, "REPLACE")
 
-    def _handle_failure(self, unwrap, ret_code):
+    def _handle_failure(self, unwrap, ret_code, is_copy=False):
         """Handle an unwrap process that exited with a non-zero code."""
         prefs = get_preferences()
         msg = ""
@@ -378,12 +751,14 @@ class UnwrapManager:
             msg = "Mesh needs cleanup"
             move_to_invalid = True
         elif ret_code == -2:
-            elapsed = (time.monotonic() - unwrap.started_at) / 60
+            elapsed = unwrap.get_runtime() / 60
             msg = f"Timed out after {elapsed:.1f} minutes"
             move_to_invalid = True
         elif ret_code == -3:
             msg = "Stop timed out (force killed)"
             move_to_invalid = True
+        elif ret_code == OUTPUT_ERROR:
+            msg = "Engine output couldn't be read"
         elif ret_code == 101:
             msg = "Non Manifold Edges"
             move_to_invalid = True
@@ -398,11 +773,15 @@ class UnwrapManager:
             move_to_invalid = True
         else:
             self.error_code = ret_code
+        self.failures.append((unwrap.input_name, msg or f"Error {ret_code}"))
+        journal.set_state(unwrap, "failed")
+        self._cancel_racers(unwrap)
 
         if move_to_invalid:
-            if prefs.invalid_collection:
+            # copies of a part weren't exported
+            if prefs.invalid_collection and unwrap.path.is_file():
                 # move to collection for invalid meshes
-                invalid_obj = import_obj(unwrap.path)
+                invalid_obj = import_mesh(unwrap.path)
                 collection = check_collection(
                     "UVgami Invalid Input", bpy.context.scene.collection
                 )
@@ -430,9 +809,15 @@ class UnwrapManager:
         unwrap.stop_process()
         unwrap.cleanup()
 
+        # copies can't be unwrapped without their source
+        for copy in unwrap.copies:
+            if copy in self._running:
+                self._handle_failure(copy, ret_code, is_copy=True)
+
         # if the invalid obj has jobs that are complete with the now reduced count
         # that means that this unwrap was the last of the group
-        if found_job is not None and found_job.is_completed():
+        # the source checks the job after all of its copies are removed
+        if not is_copy and found_job is not None and found_job.is_completed():
             # use the last completed unwrap
             self._process_completion(found_job.unwrapped[-1], invalid_pass=True)
 
@@ -448,6 +833,10 @@ class UnwrapManager:
                     for obj in valid_objects:
                         edit_restore([obj], pack)
 
+        # one undo step for the whole batch, there is no undo in background mode
+        if self.outputs and not bpy.app.background:
+            bpy.ops.ed.undo_push(message="UVgami Unwrap")
+
         self.finish()
 
         # don't show popup if all unwraps were cancelled
@@ -494,28 +883,36 @@ class UnwrapManager:
         self._running.clear()
         self._queue.clear()
         self._pack_output_objects.clear()
+        # the batch is over, there is nothing to resume
+        journal.clear()
 
         if (
             bpy.context.scene.uvgami.auto_grid
             and getattr(self, "finished_count", 0) > 0
+            and not bpy.app.background
         ):
             switch_shading("MATERIAL")
 
         # clean up io folders
-        for file in (get_extension_dir_path() / "input").iterdir():
+        for file in (get_work_dir_path() / "input").iterdir():
             file.unlink()
-        for file in (get_extension_dir_path() / "output").iterdir():
+        for file in (get_work_dir_path() / "output").iterdir():
             file.unlink()
 
     def cancel_unwrap(self, unwrap):
         """Cancel a specific unwrap."""
         self.cancelled_count += 1
+        self._cancel_racers(unwrap)
         unwrap.stop_process()
         self.remove_unwrap(unwrap)
+        journal.set_state(unwrap, "cancelled")
+        if unwrap.source is not None and unwrap in unwrap.source.copies:
+            unwrap.source.copies.remove(unwrap)
         unwrap.cleanup()
-        self.exit_viewer = True
         # update 3d view to remove progress bar
         bpy.context.view_layer.objects.active = bpy.context.view_layer.objects.active
+        # start the next queued unwrap without waiting for an idle tick
+        self.wake()
 
     def stop_all(self):
         """Stop all running processes and clean up."""
@@ -526,6 +923,7 @@ class UnwrapManager:
             unwrap.cleanup()
         self._running.clear()
         self._queue.clear()
+        journal.clear()
         self._unregister_dispatch()
         progress_bar.remove()
         self.is_active = False
@@ -2,7 +2,9 @@
 # See __init__.py and LICENSE for more information
 
 import bpy
+from .. import telemetry
 from ..logger import logger
+from ..manager import manager
 
 
 class UVGAMI_OT_clear_logs(bpy.types.Operator):
@@ -25,3 +27,31 @@ class UVGAMI_OT_copy_logs(bpy.types.Operator):
         context.window_manager.clipboard = "\n".join(logger.get_all())
         self.report({"INFO"}, "Copied to clipboard")
         return {"FINISHED"}
+
+
+class UVGAMI_OT_export_telemetry(bpy.types.Operator):
+    bl_idname = "uvgami.export_telemetry"
+    bl_label = "Export Telemetry"
+    bl_description = "Save the engine telemetry of the last unwrap as a JSON file"
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    filter_glob: bpy.props.StringProperty(default="*.json", options={"HIDDEN"})
+
+    @classmethod
+    def poll(cls, context):
+        return bool(manager.telemetry)
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "uvgami_telemetry.json"
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+    def execute(self, context):
+        try:
+            telemetry.export(bpy.path.abspath(self.filepath), manager.telemetry)
+        except OSError as e:
+            self.report({"ERROR"}, f"Could not export telemetry: {e}")
+            return {"CANCELLED"}
+        self.report({"INFO"}, "Exported telemetry")
+        return {"FINISHED"}
@@ -8,6 +8,7 @@ import subprocess
 
 import bpy
 
+from ..cache import cache
 from ..manager import manager
 from ..utils.geometry import calc_center
 from ..utils.mesh import check_exists, deselect_all, validate_obj
@@ -129,3 +130,14 @@ class UVGAMI_OT_setup_wsl(bpy.types.Operator):
 
         self.report({"INFO"}, ("Successfully setup WSL"))
         return {"FINISHED"}
+
+
+class UVGAMI_OT_clear_cache(bpy.types.Operator):
+    bl_idname = "uvgami.clear_cache"
+    bl_label = "Clear Cache"
+    bl_description = "Delete all cached unwrap results"
+
+    def execute(self, context):
+        cache.clear()
+        self.report({"INFO"}, "Cleared cache")
+        return {"FINISHED"}
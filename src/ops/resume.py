@@ -0,0 +1,184 @@
+# Copyright (C) 2022 Daniel Boxer
+# See __init__.py and LICENSE for more information
+
+import collections
+import pathlib
+
+import bpy
+
+from ..handler import handle_error
+from ..job import Cleanup
+from ..journal import journal, load_arrays, make_job
+from ..logger import logger
+from ..manager import manager
+from ..unwrap import Unwrap
+from ..utils.paths import get_preferences, get_work_dir_path
+from .start import UnwrapPipeline
+
+
+class UVGAMI_OT_resume_batch(UnwrapPipeline, bpy.types.Operator):
+    bl_idname = "uvgami.resume_batch"
+    bl_label = "Resume Batch"
+    bl_description = (
+        "Continue an unwrap that was interrupted by a crash. Finished meshes are"
+        " imported again and only unfinished meshes are unwrapped"
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return not manager.is_active and journal.exists()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset_variables()
+
+    def execute(self, context):
+        blend, jobs, records = journal.load()
+        if blend and blend != bpy.data.filepath:
+            self.report({"ERROR"}, f"Open {blend} to resume the batch")
+            return {"CANCELLED"}
+
+        self.engine_path = pathlib.Path(get_preferences().engine_path)
+        if self.check_for_errors() is not None:
+            return {"CANCELLED"}
+
+        start_objects = set(bpy.data.objects)
+        try:
+            logger.new_info()
+            if context.object is not None and context.object.mode != "OBJECT":
+                bpy.ops.object.mode_set(mode="OBJECT")
+            # the unwraps are recorded again as they are queued
+            journal.clear()
+            reimports = self.queue_records(jobs, records)
+            if not reimports and not manager.active:
+                self.report({"INFO"}, "Nothing to resume")
+                return {"FINISHED"}
+
+            manager.engine_path = self.engine_path
+            manager.start()
+            for unwrap, imported in reimports:
+                edge_path = imported["edge_path"]
+                manager.reimport(
+                    unwrap,
+                    pathlib.Path(imported["path"]),
+                    None if edge_path is None else pathlib.Path(edge_path),
+                    [tuple(e) for e in imported["added_edges"]],
+                )
+        except Exception as e:
+            handle_error(e, "START", objects=start_objects)
+        finally:
+            self.reset_variables()
+
+        self.report({"INFO"}, "UV unwrap resumed")
+        return {"FINISHED"}
+
+    def queue_records(self, job_data, records):
+        """Queue the unfinished unwraps, returns the outputs to import again."""
+        # outputs that are in the file were saved, the rest was lost in the crash
+        skipped = set()
+        for record in records.values():
+            imported = record["imported"]
+            if imported is not None and (
+                imported["output"] in bpy.data.objects
+                or not pathlib.Path(imported["path"]).is_file()
+            ):
+                skipped.update(imported["members"])
+        resumable = [
+            r
+            for r in records.values()
+            if r["id"] not in skipped and self._can_resume(r, records)
+        ]
+
+        # jobs are counted again, failed and lost unwraps are left out
+        counts = collections.Counter(
+            job_id for r in resumable for job_id in r["jobs"] if job_id is not None
+        )
+        jobs = {}
+        for job_id, data in job_data.items():
+            job = make_job(data, counts[job_id])
+            if isinstance(job, Cleanup):
+                input_obj = bpy.data.objects.get(data["input"] or "")
+                if input_obj is None:
+                    # the input was deleted or not saved, there is nothing to clean up
+                    job = None
+                else:
+                    manager.input[job] = input_obj
+            jobs[job_id] = job
+
+        unwraps = {}
+        reimports = []
+        for record in resumable:
+            unwrap = self._make_unwrap(record, jobs)
+            unwraps[record["id"]] = unwrap
+            if record["state"] == "imported":
+                journal.add(unwrap, manager.input)
+                if record["imported"] is not None:
+                    reimports.append((unwrap, record["imported"]))
+                continue
+
+            if record["state"] == "finished" or record["is_cached"]:
+                # the output is already there, it finishes without an engine
+                unwrap.is_cached = True
+            elif record["source"] is not None:
+                unwrap.source = unwraps[record["source"]]
+                unwrap.source.copies.append(unwrap)
+            manager.add(unwrap)
+
+        # joined outputs need the parts in the order they were joined
+        for unwrap, imported in reimports:
+            if unwrap.join_job is not None:
+                unwrap.join_job.unwrapped = [
+                    unwraps[m] for m in imported["members"] if m in unwraps
+                ]
+        return reimports
+
+    def _can_resume(self, record, records):
+        state = record["state"]
+        if state in ("failed", "cancelled"):
+            return False
+        if not pathlib.Path(record["arrays"]).is_file():
+            return False
+        if state == "imported":
+            return True
+        path = pathlib.Path(record["path"])
+        if state == "finished" or record["is_cached"]:
+            output_path = get_work_dir_path() / "output" / path.name
+            return output_path.is_file()
+        if record["source"] is not None:
+            source = records.get(record["source"])
+            return (
+                source is not None
+                and source["state"] != "imported"
+                and self._can_resume(source, records)
+            )
+        return path.is_file()
+
+    def _make_unwrap(self, record, jobs):
+        def optional_path(path):
+            return None if path is None else pathlib.Path(path)
+
+        material_indices, vertex_groups, coords = load_arrays(record["arrays"])
+        unwrap = Unwrap(
+            name=record["name"],
+            input_name=record["input_name"],
+            path=pathlib.Path(record["path"]),
+            guide_path=optional_path(record["guide_path"]),
+            edge_path=optional_path(record["edge_path"]),
+            jobs=tuple(None if j is None else jobs[j] for j in record["jobs"]),
+            origin=record["origin"],
+            materials=record["materials"],
+            added_edges=[tuple(e) for e in record["added_edges"]],
+            vertex_count=record["vertex_count"],
+            face_count=record["face_count"],
+            material_indices=material_indices,
+            vertex_groups=vertex_groups,
+            shade_smooth=record["shade_smooth"],
+            auto_smooth=record["auto_smooth"],
+            merge_cuts=record["merge_cuts"],
+            fingerprint=record["fingerprint"],
+        )
+        # settings of the interrupted batch, not the current ones
+        unwrap.quality = record["quality"]
+        unwrap.seam_weight = record["seam_weight"]
+        unwrap.coords = coords
+        return unwrap
@@ -10,13 +10,22 @@ import bmesh
 import bpy
 import numpy
 
+from ..cache import cache, fingerprint_mesh
 from ..handler import handle_error
 from ..job import Cleanup, Join, Preserve, Symmetrise
+from ..journal import journal
 from ..logger import logger
 from ..manager import manager
 from ..unwrap import Unwrap
-from ..utils.geometry import apply_transforms, calc_center, cut, cut_on_axes
-from ..utils.io import export_obj
+from ..utils.geometry import (
+    apply_transforms,
+    calc_center,
+    cut,
+    cut_on_axes,
+    get_world_coords,
+    shape_signature,
+)
+from ..utils.io import MESH_SUFFIX, export_mesh
 from ..utils.mesh import (
     check_collection,
     deselect_all,
@@ -26,21 +35,19 @@ from ..utils.mesh import (
 )
 from ..utils.paths import (
     get_bundled_engine_path,
-    get_extension_dir_path,
     get_linux_path,
     get_preferences,
+    get_work_dir_path,
 )
 from .guides import SEAM_RESTRICTIONS_GROUP
 
 
-class UVGAMI_OT_start(bpy.types.Operator):
-    bl_idname = "uvgami.start"
-    bl_label = "Unwrap"
-    bl_description = "Start UV unwrap process"
+class UnwrapPipeline:
+    """Steps that turn the selected objects into queued unwraps.
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.reset_variables()
+    Shared by the unwrap operator and the background batch runner.
+    Subclasses provide report().
+    """
 
     def reset_variables(self):
         self.engine_path = None
@@ -57,27 +64,6 @@ class UVGAMI_OT_start(bpy.types.Operator):
         self.separated_objects = None
         self.jobs = None
 
-    def execute(self, context):
-        start_objects = set(bpy.data.objects)
-
-        try:
-            logger.new_info()
-            prefs = get_preferences()
-            self.engine_path = pathlib.Path(prefs.engine_path)
-
-            if self.check_for_errors() is not None:
-                return {"CANCELLED"}
-            if self._prepare_unwrap_session(context) is not None:
-                return {"CANCELLED"}
-            self.start_unwraps(context)
-
-        except Exception as e:
-            handle_error(e, "START", objects=start_objects)
-
-        # these variables should only be used while operator is running
-        self.reset_variables()
-        return {"FINISHED"}
-
     def _prepare_unwrap_session(self, context):
         self.old_active = context.active_object
         self.input_objs = context.selected_objects
@@ -273,16 +259,19 @@ class UVGAMI_OT_start(bpy.types.Operator):
         bmesh.ops.split_edges(bm, edges=bm_seams)
 
     def prepare_io_folders(self):
-        input_path = get_extension_dir_path() / "input"
+        # a running batch keeps its folder, a new one checks the preference again
+        work_dir = get_work_dir_path(refresh=not manager.is_active)
+        input_path = work_dir / "input"
         input_path.mkdir(exist_ok=True)
-        output_path = input_path.parent / "output"
+        output_path = work_dir / "output"
         output_path.mkdir(exist_ok=True)
-        # io folder clean up
+        # io folder clean up, an interrupted batch can't be resumed after this
         if not manager.is_active:
             for file in input_path.iterdir():
                 file.unlink()
             for file in output_path.iterdir():
                 file.unlink()
+            journal.clear()
 
         return input_path, output_path
 
@@ -368,23 +357,42 @@ class UVGAMI_OT_start(bpy.types.Operator):
 
         return jobs, separated_objects
 
-    def start_unwraps(self, context):
+    def queue_unwraps(self, context):
+        """Export the prepared objects and add them to the manager queue."""
         props = context.scene.uvgami
+        output_path = self.input_path.parent / "output"
+        # the engine writes its output in the format of its input
+        suffix = MESH_SUFFIX if get_preferences().binary_meshes else ".obj"
+        if not manager.is_active:
+            cache.reset_counts()
+        # the cache key hashes the engine, so it's needed before the first restore
+        manager.engine_path = self.engine_path
+        # first unwrap of each shape in a join, by shape key
+        shapes = {}
 
         for obj in self.separated_objects:
             # get unwrap name
             unwrap_name = self.names[obj.name][1]
-            path = self.input_path / f"{bpy.path.clean_name(unwrap_name)}.obj"
+            path = self.input_path / f"{bpy.path.clean_name(unwrap_name)}{suffix}"
             # if path to file already exists, find a unique name
-            while path.is_file():
-                path = path.parent / (f"{path.stem}1.obj")
+            # cached unwraps only have an output file
+            while path.is_file() or (output_path / path.name).is_file():
+                path = path.parent / (f"{path.stem}1{suffix}")
 
             edge_path, new_edges = self._triangulate_mesh(obj, path, props)
 
-            export_obj(obj, path, props.import_uvs)
-
             guide_path = self._create_guide_file(obj, path, props)
 
+            fingerprint = None
+            if cache.is_enabled:
+                fingerprint = fingerprint_mesh(obj, guide_path, props.import_uvs)
+
+            shape = None
+            coords = None
+            if self.jobs[obj]["join"] is not None and not props.import_uvs:
+                coords = get_world_coords(obj)
+                shape = self._get_shape_key(obj, coords, guide_path, new_edges)
+
             materials, material_indices, vertex_groups, shade_smooth, auto_smooth = (
                 self._get_mesh_metadata(obj)
             )
@@ -405,22 +413,38 @@ class UVGAMI_OT_start(bpy.types.Operator):
                 materials=materials,
                 added_edges=new_edges,
                 vertex_count=len(obj.data.vertices),
+                face_count=len(obj.data.polygons),
                 material_indices=material_indices,
                 vertex_groups=vertex_groups,
                 shade_smooth=shade_smooth,
                 auto_smooth=auto_smooth,
                 merge_cuts=props.use_cuts and not props.use_symmetry,
+                fingerprint=fingerprint,
             )
+            if shape in shapes:
+                # identical parts get the uvs of the first one, they aren't exported
+                unwrap.source = shapes[shape]
+                unwrap.coords = coords
+                unwrap.source.copies.append(unwrap)
+            else:
+                if shape is not None:
+                    shapes[shape] = unwrap
+                # unchanged parts are restored from the cache and aren't exported
+                if not cache.restore(unwrap):
+                    export_mesh(obj, path, props.import_uvs)
             manager.add(unwrap)
 
             bpy.data.objects.remove(obj, do_unlink=True)
 
+    def start_unwraps(self, context):
+        self.queue_unwraps(context)
+
         if not manager.is_active:
-            manager.engine_path = self.engine_path
             manager.start()
         else:
             # fix progress bar ratio
             manager.starting_count += len(self.separated_objects)
+            manager.wake()
         context.view_layer.objects.active = self.old_active
         bpy.ops.object.mode_set(mode=self.old_mode)
 
@@ -505,6 +529,16 @@ class UVGAMI_OT_start(bpy.types.Operator):
 
         return guide_path
 
+    def _get_shape_key(self, obj, coords, guide_path, new_edges):
+        """Parts of a join with the same key give the same engine result."""
+        guide = guide_path.read_text() if guide_path is not None else ""
+        return (
+            self.jobs[obj]["join"],
+            shape_signature(obj, coords),
+            guide,
+            tuple(new_edges),
+        )
+
     def _get_mesh_metadata(self, obj):
         """Gather materials and shading info from the mesh."""
         # get materials
@@ -539,3 +573,34 @@ class UVGAMI_OT_start(bpy.types.Operator):
             vertex_groups[group.name] = weights
 
         return materials, material_indices, vertex_groups, shade_smooth, angle
+
+
+class UVGAMI_OT_start(UnwrapPipeline, bpy.types.Operator):
+    bl_idname = "uvgami.start"
+    bl_label = "Unwrap"
+    bl_description = "Start UV unwrap process"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset_variables()
+
+    def execute(self, context):
+        start_objects = set(bpy.data.objects)
+
+        try:
+            logger.new_info()
+            prefs = get_preferences()
+            self.engine_path = pathlib.Path(prefs.engine_path)
+
+            if self.check_for_errors() is not None:
+                return {"CANCELLED"}
+            if self._prepare_unwrap_session(context) is not None:
+                return {"CANCELLED"}
+            self.start_unwraps(context)
+
+        except Exception as e:
+            handle_error(e, "START", objects=start_objects)
+
+        # these variables should only be used while operator is running
+        self.reset_variables()
+        return {"FINISHED"}
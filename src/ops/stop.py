@@ -5,7 +5,7 @@ import bpy
 
 from ..job import Join
 from ..manager import manager
-from ..utils.io import import_obj, print_stdin
+from ..utils.io import import_mesh, print_stdin
 from ..utils.mesh import check_collection, move_to_collection
 from ..utils.paths import get_preferences
 
@@ -21,16 +21,48 @@ class UVGAMI_OT_stop(bpy.types.Operator):
     def execute(self, context):
         for unwrap in manager.active[self.start_idx : self.end_idx]:
             if unwrap.process is not None:
+                # a suspended engine can't read the stop command
+                unwrap.resume()
                 # send stop command
                 if not print_stdin(unwrap.process, "stop"):
                     self.report({"ERROR"}, "Could not stop unwrap")
-            else:
-                unwrap.is_stopped = True
+            # also marks the result as partial so it isn't cached
+            unwrap.is_stopped = True
+        manager.wake()
 
         self.report({"INFO"}, "UV unwrap stop in progress")
         return {"FINISHED"}
 
 
+class UVGAMI_OT_pause(bpy.types.Operator):
+    bl_idname = "uvgami.pause"
+    bl_label = "Pause"
+    bl_description = (
+        "Pause or resume UV unwrap. Paused unwraps don't use a core,"
+        " so other unwraps can start"
+    )
+
+    start_idx: bpy.props.IntProperty()
+    end_idx: bpy.props.IntProperty()
+
+    def execute(self, context):
+        unwraps = manager.active[self.start_idx : self.end_idx]
+        if all(unwrap.is_paused for unwrap in unwraps):
+            for unwrap in unwraps:
+                unwrap.resume()
+            self.report({"INFO"}, "UV unwrap resumed")
+        else:
+            for unwrap in unwraps:
+                if not unwrap.pause():
+                    self.report({"ERROR"}, "Could not pause unwrap")
+                    break
+            else:
+                self.report({"INFO"}, "UV unwrap paused")
+        # paused unwraps free their slot for the next one in the queue
+        manager.wake()
+        return {"FINISHED"}
+
+
 class UVGAMI_OT_cancel(bpy.types.Operator):
     bl_idname = "uvgami.cancel"
     bl_label = "Cancel"
@@ -42,6 +74,9 @@ class UVGAMI_OT_cancel(bpy.types.Operator):
     def execute(self, context):
         unwraps = manager.active[self.start_idx : self.end_idx]
         cancel_count = len(unwraps)
+        # copies of a part can't finish without it
+        for unwrap in list(unwraps):
+            unwraps.extend(c for c in unwrap.copies if c not in unwraps)
 
         for unwrap in unwraps:
             # individual cancel from a group: move to invalid collection
@@ -52,7 +87,7 @@ class UVGAMI_OT_cancel(bpy.types.Operator):
             )
             if is_individual_from_group and get_preferences().invalid_collection:
                 if unwrap.path.is_file():
-                    invalid_obj = import_obj(unwrap.path)
+                    invalid_obj = import_mesh(unwrap.path)
                     collection = check_collection(
                         "UVgami Invalid Input", context.scene.collection
                     )
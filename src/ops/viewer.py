@@ -4,9 +4,9 @@
 import bpy
 
 from ..manager import manager
-from ..utils.io import import_obj
-from ..utils.mesh import check_exists, deselect_all, move_to_collection
+from ..utils.mesh import deselect_all
 from ..utils.paths import get_preferences
+from ..uv_viewer import uv_viewer
 
 old_ui = None
 
@@ -40,6 +40,22 @@ def enter_viewer():
         bpy.ops.image.view_all(fit_view=True)
 
 
+def get_viewable():
+    """Running unwraps with an engine, cached unwraps and copies have none."""
+    return [unwrap for unwrap in manager.active if unwrap.process is not None]
+
+
+def show_unwrap(unwrap):
+    if manager.current_viewer is not None:
+        manager.current_viewer.viewing = False
+    manager.current_viewer = unwrap
+    unwrap.viewing = True
+    uv_viewer.title = unwrap.name
+    # the last snapshot is from the previous unwrap
+    uv_viewer.clear()
+    manager.wake()
+
+
 class UVGAMI_OT_view_unwrap(bpy.types.Operator):
     bl_idname = "uvgami.view_unwrap"
     bl_label = "View Unwrap"
@@ -51,64 +67,62 @@ class UVGAMI_OT_view_unwrap(bpy.types.Operator):
 
     def execute(self, context):
         unwrap = manager.active[self.index]
+        if unwrap.is_cached:
+            # the input wasn't exported, the result is imported right away
+            self.report({"INFO"}, "Unwrap was restored from the cache")
+            return {"CANCELLED"}
+        if unwrap.source is not None:
+            self.report(
+                {"INFO"}, f"Identical to {unwrap.source.name}, view that instead"
+            )
+            return {"CANCELLED"}
+        if manager.is_viewer_active:
+            # the viewer is already drawing, only the unwrap changes
+            show_unwrap(unwrap)
+            return {"FINISHED"}
         manager.is_viewer_active = True
-        manager.exit_viewer = False
-
-        # make viewer
-        if unwrap.viewer_obj is None or not check_exists(unwrap.viewer_obj):
-            viewer = import_obj(unwrap.path, f"{unwrap.name}_viewer")
-            unwrap.viewer_obj = viewer
-
-            # scale viewer down
-            viewer.scale = (0, 0, 0)
-
-        viewer = unwrap.viewer_obj
-        if len(viewer.users_collection) == 0:
-            # move to scene collection
-            context.scene.collection.objects.link(viewer)
-        elif viewer.users_collection[0] != context.scene.collection:
-            move_to_collection(viewer, context.scene.collection)
 
+        uv_viewer.start()
+        show_unwrap(unwrap)
         enter_viewer()
 
-        # make uvs visible by going into edit mode
-        deselect_all()
-        viewer.select_set(True)
-        bpy.context.view_layer.objects.active = viewer
-        bpy.ops.object.mode_set(mode="EDIT")
-        bpy.ops.mesh.select_all(action="SELECT")
-
-        manager.current_viewer = unwrap
-        unwrap.viewing = True
-        self.report({"INFO"}, "Click to exit viewer")
+        self.report({"INFO"}, "Press ESC to exit viewer, arrow keys to switch unwrap")
+        # checks if the unwrap has finished while there is no input
+        self._timer = context.window_manager.event_timer_add(0.5, window=context.window)
         context.window_manager.modal_handler_add(self)
         return {"RUNNING_MODAL"}
 
     def modal(self, context, event):
-        if (
-            event.type == "LEFTMOUSE"
-            or event.type == "RIGHTMOUSE"
-            or manager.exit_viewer
-        ):
-            manager.is_viewer_active = False
-            if manager.current_viewer is not None:
-                manager.current_viewer.viewing = False
-
-            if old_ui is not None:
-                if isinstance(old_ui, str):
-                    context.area.ui_type = old_ui
-                else:
-                    context.window.workspace = old_ui
-
-            # unlink current viewer mesh
-            current = manager.current_viewer.viewer_obj
-            if current is not None and check_exists(current):
-                for collection in current.users_collection:
-                    collection.objects.unlink(current)
-
+        viewable = get_viewable()
+        if event.type == "ESC" or not viewable:
+            self.exit(context)
             return {"FINISHED"}
 
-        return {"RUNNING_MODAL"}
+        current = manager.current_viewer
+        if current not in viewable:
+            # the unwrap finished or was cancelled, show the next one
+            show_unwrap(viewable[0])
+        elif event.type in ("LEFT_ARROW", "RIGHT_ARROW") and event.value == "PRESS":
+            step = 1 if event.type == "RIGHT_ARROW" else -1
+            show_unwrap(viewable[(viewable.index(current) + step) % len(viewable)])
+            return {"RUNNING_MODAL"}
+
+        # the uv editor can still be moved and zoomed
+        return {"PASS_THROUGH"}
+
+    def exit(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        uv_viewer.remove()
+        manager.is_viewer_active = False
+        if manager.current_viewer is not None:
+            manager.current_viewer.viewing = False
+            manager.current_viewer = None
+
+        if old_ui is not None:
+            if isinstance(old_ui, str):
+                context.area.ui_type = old_ui
+            else:
+                context.window.workspace = old_ui
 
 
 class UVGAMI_OT_view_uvs(bpy.types.Operator):
@@ -0,0 +1,149 @@
+# Copyright (C) 2022 Daniel Boxer
+# See __init__.py and LICENSE for more information
+
+import os
+import platform
+import queue
+import selectors
+import threading
+import traceback
+
+# bytes read from a pipe at once
+CHUNK_SIZE = 64 * 1024
+# seconds the reader thread waits for a new engine before it exits
+IDLE_TIMEOUT = 5.0
+# exit code reported for an unwrap whose output couldn't be handled
+OUTPUT_ERROR = -4
+
+
+class OutputReader:
+    """Read the stdout of all engine processes on one thread.
+
+    Pipes are multiplexed with selectors and read in large chunks, the
+    lines of each chunk are decoded together and passed to the unwrap.
+    The thread exits when no engine has been running for a while and is
+    started again by the next one. Windows can't select on pipes, so there
+    each engine still gets its own thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = queue.SimpleQueue()
+        self._thread = None
+        self._selector = None
+        self._wake_read = None
+        self._wake_write = None
+
+    @property
+    def can_select(self):
+        return platform.system() != "Windows"
+
+    def add(self, unwrap):
+        """Start reading the output of a started unwrap."""
+        if not self.can_select:
+            threading.Thread(
+                target=self._read_blocking, args=(unwrap,), daemon=True
+            ).start()
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._selector = selectors.DefaultSelector()
+                self._wake_read, self._wake_write = os.pipe()
+                self._selector.register(self._wake_read, selectors.EVENT_READ)
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._pending.put(unwrap)
+            # interrupt select so the new pipe is registered right away
+            os.write(self._wake_write, b"\0")
+
+    def _run(self):
+        while True:
+            events = self._selector.select(IDLE_TIMEOUT)
+            for key, _ in events:
+                if key.fileobj == self._wake_read:
+                    os.read(self._wake_read, CHUNK_SIZE)
+                    self._register_pending()
+                else:
+                    self._read(key)
+
+            with self._lock:
+                # only the wake pipe is left
+                if not events and len(self._selector.get_map()) == 1:
+                    if self._pending.empty():
+                        self._close()
+                        return
+
+    def _register_pending(self):
+        while True:
+            try:
+                unwrap = self._pending.get_nowait()
+            except queue.Empty:
+                return
+            # the remainder is the start of a line that isn't complete yet
+            self._selector.register(
+                unwrap.process.stdout, selectors.EVENT_READ, [unwrap, b""]
+            )
+
+    def _read(self, key):
+        unwrap, remainder = key.data
+        try:
+            chunk = key.fileobj.read(CHUNK_SIZE)
+            if chunk:
+                key.data[1] = _feed(unwrap, remainder + chunk)
+                return
+            self._selector.unregister(key.fileobj)
+            _finish(unwrap, remainder)
+        except Exception:
+            # the thread reads all engines, one bad output only fails its unwrap
+            if key.fileobj in self._selector.get_map():
+                self._selector.unregister(key.fileobj)
+            _fail(unwrap)
+
+    def _read_blocking(self, unwrap):
+        remainder = b""
+        try:
+            for chunk in iter(lambda: unwrap.process.stdout.read(CHUNK_SIZE), b""):
+                remainder = _feed(unwrap, remainder + chunk)
+            _finish(unwrap, remainder)
+        except Exception:
+            _fail(unwrap)
+
+    def _close(self):
+        self._selector.close()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+        self._selector = None
+        self._thread = None
+
+
+def _feed(unwrap, data):
+    """Pass the complete lines to the unwrap, returns the incomplete end."""
+    end = data.rfind(b"\n") + 1
+    if end > 0:
+        # splitlines also removes the \r of windows line endings
+        unwrap.handle_output(data[:end].decode(errors="replace").splitlines())
+    return data[end:]
+
+
+def _finish(unwrap, remainder):
+    if remainder:
+        unwrap.handle_output(remainder.decode(errors="replace").splitlines())
+    unwrap.process.stdout.close()
+    # stdout can close just before the engine exits, the manager polls for
+    # the exit then, waiting here would hold up the other engines
+    ret_code = unwrap.process.poll()
+    if ret_code is not None:
+        unwrap.handle_exit(ret_code)
+
+
+def _fail(unwrap):
+    print(f"UVgami: Could not read the output of {unwrap.input_name}")
+    traceback.print_exc()
+    # posted before the engine is stopped, so it's the exit the manager sees
+    unwrap.handle_exit(OUTPUT_ERROR)
+    unwrap.stop_process()
+    unwrap.process.stdout.close()
+
+
+reader = OutputReader()
@@ -4,6 +4,7 @@
 import math
 import numpy
 from .pyqtree import Index
+from .utils.io import read_mesh, write_mesh
 
 
 class Vertex:
@@ -49,71 +50,60 @@ def reroute_seams(path, edge_path):
     edge_face = {}
     quadtree = Index(bbox=(0, 0, 1, 1))
 
-    # read obj file
-    for line in path.open("r"):
-        if line.startswith("v "):
-            line = line[2:]
-            vertices.append(Vertex(line.split()))
-
-        elif line.startswith("vt "):
-            line = line[3:]
-            uv = UV(line.split())
-            uvs.append(uv)
-            # add to quadtree
-            quadtree.insert(uv, (uv.x, uv.y))
-
-        elif line.startswith("f "):
-            line = line[2:]
-            face = Face()
-            faces.append(face)
-
-            # vertex indices
-            v = []
-            # uv coordinate indices
-            vt = []
-            for face_v in line.split():
-                face_v = face_v.split("/")
-                face.v.append(int(face_v[0]))
-                v.append(int(face_v[0]))
-                face.vt.append(int(face_v[1]))
-                vt.append(int(face_v[1]))
-
-            # get linked texture coordinates
-            for v_idx, vertex in enumerate(v):
-
-                # if the vertex key isn't in dictionary yet
-                if vertex not in v_vt:
-                    # set it to empty array (unknown size)
-                    v_vt[vertex] = []
-
-                # get the vt linked to the current vertex (v)
-                face_vt = vt[v_idx]
-
-                # don't add if already linked
-                if face_vt not in v_vt[vertex]:
-                    v_vt[vertex].append(face_vt)
-
-            # get uv edges
-
-            # format: other vt, first vt, second vt
-
-            # edge 1
-            uvs[vt[0] - 1].edge_v.append((vt[1], vt[0], vt[1]))
-            uvs[vt[1] - 1].edge_v.append((vt[0], vt[0], vt[1]))
-
-            # edge 2
-            uvs[vt[1] - 1].edge_v.append((vt[2], vt[1], vt[2]))
-            uvs[vt[2] - 1].edge_v.append((vt[1], vt[1], vt[2]))
-
-            # edge 3
-            uvs[vt[2] - 1].edge_v.append((vt[0], vt[2], vt[0]))
-            uvs[vt[0] - 1].edge_v.append((vt[2], vt[2], vt[0]))
-
-            # get face edges
-            # edge is linked to a face
-            edge_face[(v[0], v[1])] = face
-            edge_face[(v[1], v[2])] = face
-            edge_face[(v[2], v[0])] = face
+    # read mesh file, indices start at 1 like in an obj file
+    v_co, uv_co, face_vs, face_vts = read_mesh(path)
+    for co in v_co.tolist():
+        vertices.append(Vertex(co))
+
+    for co in uv_co.tolist():
+        uv = UV(co)
+        uvs.append(uv)
+        # add to quadtree
+        quadtree.insert(uv, (uv.x, uv.y))
+
+    # vertex indices and uv coordinate indices
+    for v, vt in zip((face_vs + 1).tolist(), (face_vts + 1).tolist()):
+        face = Face()
+        faces.append(face)
+        face.v = list(v)
+        face.vt = list(vt)
+
+        # get linked texture coordinates
+        for v_idx, vertex in enumerate(v):
+
+            # if the vertex key isn't in dictionary yet
+            if vertex not in v_vt:
+                # set it to empty array (unknown size)
+                v_vt[vertex] = []
+
+            # get the vt linked to the current vertex (v)
+            face_vt = vt[v_idx]
+
+            # don't add if already linked
+            if face_vt not in v_vt[vertex]:
+                v_vt[vertex].append(face_vt)
+
+        # get uv edges
+
+        # format: other vt, first vt, second vt
+
+        # edge 1
+        uvs[vt[0] - 1].edge_v.append((vt[1], vt[0], vt[1]))
+        uvs[vt[1] - 1].edge_v.append((vt[0], vt[0], vt[1]))
+
+        # edge 2
+        uvs[vt[1] - 1].edge_v.append((vt[2], vt[1], vt[2]))
+        uvs[vt[2] - 1].edge_v.append((vt[1], vt[1], vt[2]))
+
+        # edge 3
+        uvs[vt[2] - 1].edge_v.append((vt[0], vt[2], vt[0]))
+        uvs[vt[0] - 1].edge_v.append((vt[2], vt[2], vt[0]))
+
+        # get face edges
+        # edge is linked to a face
+        edge_face[(v[0], v[1])] = face
+        edge_face[(v[1], v[2])] = face
+        edge_face[(v[2], v[0])] = face
 
     # go through added edges
     for line in edge_path.open("r"):
@@ -308,13 +298,11 @@ def reroute_seams(path, edge_path):
 
                 break
 
-    # rewrite obj file
-    with path.open("w") as file:
-        for v in vertices:
-            file.write(f"v {v.x} {v.y} {v.z}\n")
-
-        for vt in uvs:
-            file.write(f"vt {vt.x} {vt.y}\n")
-
-        for f in faces:
-            file.write(f"f {f.v[0]}/{f.vt[0]} {f.v[1]}/{f.vt[1]} {f.v[2]}/{f.vt[2]}\n")
+    # rewrite mesh file
+    write_mesh(
+        path,
+        numpy.array([(v.x, v.y, v.z) for v in vertices]),
+        numpy.array([(vt.x, vt.y) for vt in uvs]),
+        numpy.array([f.v for f in faces]) - 1,
+        numpy.array([f.vt for f in faces]) - 1,
+    )
@@ -0,0 +1,249 @@
+# Copyright (C) 2022 Daniel Boxer
+# See __init__.py and LICENSE for more information
+
+import itertools
+import multiprocessing
+import time
+
+from .utils.system import (
+    get_cpu_times,
+    get_load_average,
+    get_process_cpu_time,
+    has_proc,
+)
+
+# engine upper bound (-u) for each quality level
+QUALITY_BOUNDS = {"HIGH": "4.05", "MEDIUM": "4.1", "LOW": "4.2"}
+# faster quality levels that race an unwrap when there are spare cores
+RACE_QUALITIES = {"HIGH": ("MEDIUM", "LOW"), "MEDIUM": ("LOW",), "LOW": ()}
+# engine max seam weight (-s) for each seam restriction weight
+SEAM_WEIGHTS = {5: "200", 4: "150", 3: "100", 2: "50", 1: "25"}
+
+# queue order of each priority, higher goes first
+PRIORITIES = {"HIGH": 1, "NORMAL": 0, "LOW": -1}
+
+# relative runtime of each quality level, a lower upper bound takes longer
+QUALITY_COST = {"HIGH": 2.0, "MEDIUM": 1.0, "LOW": 0.6}
+# the engine does slightly more than linear work per face
+FACE_EXPONENT = 1.2
+
+# engine memory, used until a real peak has been measured
+ENGINE_BASE_MEMORY = 64 * 1024**2
+MEMORY_PER_FACE = 24 * 1024
+
+
+def estimate_cost(unwrap):
+    """Estimate the relative runtime of an unwrap."""
+    seam_weight = unwrap.seam_weight if unwrap.guide_path is not None else None
+    return relative_cost(unwrap.face_count, unwrap.quality, seam_weight)
+
+
+def relative_cost(face_count, quality, seam_weight=None):
+    """Relative runtime, seam_weight is None if there are no seam restrictions."""
+    cost = max(face_count, 1) ** FACE_EXPONENT
+    cost *= QUALITY_COST.get(quality, 1.0)
+    if seam_weight is not None:
+        # seam restrictions slow the engine down more as the weight goes up
+        cost *= 1 + seam_weight * 0.1
+    return cost
+
+
+def estimate_memory(unwrap, per_face=None):
+    """Estimate the peak memory of an engine process in bytes."""
+    if per_face is None:
+        per_face = MEMORY_PER_FACE
+    return ENGINE_BASE_MEMORY + unwrap.face_count * per_face
+
+
+# fraction of the cpu that auto concurrency tries to keep busy
+TARGET_UTILISATION = 0.9
+# seconds between auto concurrency adjustments, load needs time to settle
+ADJUST_INTERVAL = 5.0
+
+
+class ConcurrencyController:
+    """Pick the number of running unwraps from the current system load.
+
+    Every adjustment measures how many cores the running engines use and how
+    busy the rest of the system is, then moves the limit toward the number of
+    engines that would bring the cpu to the target utilisation. Growing can
+    take several steps at once, shrinking is one step at a time so a short
+    spike doesn't stall the batch. Running unwraps are never stopped, a lower
+    limit only keeps new ones in the queue.
+    """
+
+    def __init__(self):
+        self.cpu_count = multiprocessing.cpu_count()
+        self.reset()
+
+    def reset(self):
+        self.limit = max(self.cpu_count // 2, 1)
+        self._last_time = None
+        self._last_system = None
+        self._last_engine = {}
+
+    def update(self, running):
+        """Return the current limit, adjusting it if enough time has passed."""
+        if not has_proc():
+            return self.limit
+        now = time.monotonic()
+        if self._last_time is not None and now - self._last_time < ADJUST_INTERVAL:
+            return self.limit
+
+        system = get_cpu_times()
+        engine = {}
+        for unwrap in running:
+            if unwrap.process is None or unwrap.is_paused:
+                continue
+            cpu_time = get_process_cpu_time(unwrap.process.pid)
+            if cpu_time is not None:
+                engine[unwrap.process.pid] = cpu_time
+
+        if self._last_time is not None and system is not None:
+            self._adjust(now - self._last_time, system, engine)
+
+        self._last_time = now
+        self._last_system = system
+        self._last_engine = engine
+        return self.limit
+
+    def _adjust(self, elapsed, system, engine):
+        busy = system[0] - self._last_system[0]
+        total = system[1] - self._last_system[1]
+        if total <= 0 or elapsed <= 0:
+            return
+
+        # cores used by the engines that were running for the whole interval
+        engine_cores = 0
+        measured = 0
+        for pid, cpu_time in engine.items():
+            if pid in self._last_engine:
+                engine_cores += (cpu_time - self._last_engine[pid]) / elapsed
+                measured += 1
+        per_engine = engine_cores / measured if measured else 1.0
+        # an engine waiting on io or stdin still holds a slot
+        per_engine = max(per_engine, 0.5)
+
+        used_cores = busy / total * self.cpu_count
+        other_cores = max(used_cores - engine_cores, 0)
+        free_cores = self.cpu_count * TARGET_UTILISATION - other_cores
+        target = int(free_cores / per_engine)
+
+        load = get_load_average()
+        if load is not None and load > self.cpu_count:
+            # more runnable threads than cores, don't add more
+            target = min(target, self.limit - 1)
+
+        target = min(max(target, 1), self.cpu_count)
+        if target > self.limit:
+            self.limit += max((target - self.limit) // 2, 1)
+        elif target < self.limit:
+            self.limit -= 1
+
+
+class UnwrapQueue:
+    """Queue that pops the most expensive unwrap first.
+
+    Longest job first keeps a big mesh from being started last and running
+    alone while the other cores sit idle. Parts of the same join job stay
+    next to each other so they still finish close together. A group is
+    ordered by its most expensive part, and a group that has already started
+    goes before any new group. Priority comes before all of that, and paused
+    unwraps are skipped until they are resumed. Pausing is checked on every
+    peek, a changed priority sorts the queue again.
+    """
+
+    def __init__(self):
+        self._items = []
+        self._costs = {}
+        self._order = {}
+        self._counter = itertools.count()
+        self._started = set()
+        self._is_sorted = True
+        # priorities the items were sorted with, they can change while queued
+        self._priorities = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        self._sort()
+        return iter(list(self._items))
+
+    def __contains__(self, unwrap):
+        return unwrap in self._costs
+
+    def append(self, unwrap):
+        self._costs[unwrap] = estimate_cost(unwrap)
+        self._order[unwrap] = next(self._counter)
+        self._items.append(unwrap)
+        self._is_sorted = False
+
+    def peek(self):
+        """The next unwrap to start, None if all of them are paused."""
+        self._sort()
+        for unwrap in self._items:
+            if not unwrap.is_paused:
+                return unwrap
+        return None
+
+    def popleft(self):
+        unwrap = self.peek()
+        self._items.remove(unwrap)
+        self._started.add(_group_key(unwrap))
+        self._forget(unwrap)
+        return unwrap
+
+    def remove(self, unwrap):
+        self._items.remove(unwrap)
+        self._forget(unwrap)
+
+    def clear(self):
+        self._items.clear()
+        self._costs.clear()
+        self._order.clear()
+        self._started.clear()
+
+    def cost(self, unwrap):
+        return self._costs.get(unwrap, 0)
+
+    def _forget(self, unwrap):
+        del self._costs[unwrap]
+        del self._order[unwrap]
+        key = _group_key(unwrap)
+        if not any(_group_key(u) == key for u in self._items):
+            self._started.discard(key)
+
+    def _sort(self):
+        priorities = [unwrap.priority for unwrap in self._items]
+        if self._is_sorted and priorities == self._priorities:
+            return
+        # a group is keyed by its join job, single unwraps are their own group
+        group_cost = {}
+        group_order = {}
+        group_priority = {}
+        for unwrap in self._items:
+            key = _group_key(unwrap)
+            group_cost[key] = max(group_cost.get(key, 0), self._costs[unwrap])
+            group_order.setdefault(key, self._order[unwrap])
+            priority = max(group_priority.get(key, unwrap.priority), unwrap.priority)
+            group_priority[key] = priority
+
+        def sort_key(unwrap):
+            key = _group_key(unwrap)
+            return (
+                -group_priority[key],
+                key not in self._started,
+                -group_cost[key],
+                group_order[key],
+                -self._costs[unwrap],
+                self._order[unwrap],
+            )
+
+        self._items.sort(key=sort_key)
+        self._priorities = [unwrap.priority for unwrap in self._items]
+        self._is_sorted = True
+
+
+def _group_key(unwrap):
+    return unwrap.join_job if unwrap.join_job is not None else unwrap
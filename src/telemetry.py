@@ -0,0 +1,36 @@
+# Copyright (C) 2022 Daniel Boxer
+# See __init__.py and LICENSE for more information
+
+import json
+
+# fields of an engine telemetry line, times are in seconds
+FIELDS = (
+    "iteration",
+    "energy",
+    "seam_length",
+    "time",
+    "hessian",
+    "factorize",
+    "line_search",
+    "topology",
+    "faces",
+)
+# iterations kept per unwrap, the oldest are dropped first
+MAX_RECORDS = 10000
+
+
+def parse_line(line):
+    """Values of a telemetry line without its prefix, None if it's invalid."""
+    values = line.split()
+    if len(values) != len(FIELDS):
+        return None
+    try:
+        return tuple(float(value) for value in values)
+    except ValueError:
+        return None
+
+
+def export(path, unwraps):
+    """Write the telemetry of a batch as JSON, unwraps are the collected dicts."""
+    with open(path, "w") as f:
+        json.dump({"fields": FIELDS, "unwraps": unwraps}, f)
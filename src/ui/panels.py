@@ -1,14 +1,26 @@
 # Copyright (C) 2022 Daniel Boxer
 # See __init__.py and LICENSE for more information
 
+import time
+
 import bpy
 
+from ..history import format_duration
+from ..journal import journal
 from ..logger import logger
 from ..manager import manager
 from ..utils.paths import get_preferences
 from ..utils.ui import newline_label
 
 
+def _with_remaining(text, unwrap):
+    """Add the predicted time left of an unwrap to a label."""
+    remaining = manager.get_remaining(unwrap)
+    if not remaining:
+        return text
+    return f"{text} (~{format_duration(remaining)})"
+
+
 class UVGAMI_PT_main(bpy.types.Panel):
     bl_label = "UVgami"
     bl_space_type = "VIEW_3D"
@@ -23,11 +35,24 @@ class UVGAMI_PT_main(bpy.types.Panel):
         row.scale_y = 2
         row.operator("uvgami.start", icon="UV")
 
+        if not manager.is_active and journal.exists():
+            box.operator("uvgami.resume_batch", icon="RECOVER_LAST")
+
         active_unwraps = manager.active
         if active_unwraps:
             row = box.box().row()
             row.alignment = "CENTER"
-            row.label(text="UV unwrap in progress")
+            remaining = manager.get_batch_remaining()
+            if remaining is None:
+                row.label(text="UV unwrap in progress")
+            else:
+                remaining = format_duration(remaining)
+                row.label(text=f"UV unwrap in progress, {remaining} left")
+            if manager.deadline is not None:
+                row = box.row()
+                row.alignment = "CENTER"
+                budget = max(manager.deadline - time.monotonic(), 0)
+                row.label(text=f"Time budget: {format_duration(budget)} left")
 
             if manager.is_viewer_active:
                 viewer_ui = box.box().row()
@@ -97,15 +122,21 @@ class UVGAMI_PT_main(bpy.types.Panel):
                 label_text = group[0].input_name
                 is_active = group_id in active_groups
             else:
-                label_text = group[0].name
+                label_text = _with_remaining(group[0].name, group[0])
                 is_active = group[0].is_active
             row.label(
                 text=label_text,
                 icon=f"RADIOBUT_{'ON' if is_active else 'OFF'}",
             )
 
-            # group stop and cancel button
+            # group pause, stop and cancel button
             if expand_layout:
+                is_paused = all(u.is_paused for u in group)
+                pause_op = row.operator(
+                    "uvgami.pause", text="", icon="PLAY" if is_paused else "PAUSE"
+                )
+                pause_op.start_idx = cancel_index
+                pause_op.end_idx = cancel_index + len(group)
                 if is_active:
                     stop_op = row.operator("uvgami.stop", text="", icon="SNAP_FACE")
                     stop_op.start_idx = cancel_index
@@ -122,10 +153,18 @@ class UVGAMI_PT_main(bpy.types.Panel):
                     if expand_layout:
                         row = display_box.row()
                         row.label(
-                            text=item.name,
+                            text=_with_remaining(item.name, item),
                             icon=f"LAYER_{'ACTIVE' if item.is_active else 'USED'}",
                         )
 
+                    # pause button
+                    pause_op = row.operator(
+                        "uvgami.pause",
+                        text="",
+                        icon="PLAY" if item.is_paused else "PAUSE",
+                    )
+                    pause_op.start_idx = cancel_index
+                    pause_op.end_idx = cancel_index + 1
                     if item.progress != (0, 0, 1):
                         # viewer button
                         view_op = row.operator(
@@ -174,15 +213,44 @@ class UVGAMI_PT_speed(bpy.types.Panel):
         if props.concurrent:
             split = box.split()
             split.label(icon="SYSTEM", text="Cores")
-            split.prop(props, "max_cores", slider=True)
+            row = split.row(align=True)
+            sub = row.row(align=True)
+            sub.active = not props.auto_cores
+            sub.prop(props, "max_cores", slider=True)
+            row.prop(props, "auto_cores", toggle=True)
+
+        row = box.row()
+        row.label(text="Priority", icon="SORT_DESC")
+        row.prop(props, "priority")
 
         row = box.row()
         row.label(text="Finish", icon="TEMP")
+        row = row.row(align=True)
         row.prop(props, "early_stop")
+        row.prop(props, "plateau_stop", toggle=True)
+
+        if props.plateau_stop:
+            row = box.row(align=True)
+            row.prop(props, "plateau_window")
+            row.prop(props, "plateau_epsilon")
 
         row = box.row()
         row.label(text="Timeout", icon="TIME")
+        row = row.row(align=True)
         row.prop(props, "unwrap_timeout")
+        row.prop(props, "auto_timeout", toggle=True)
+
+        row = box.row()
+        row.label(text="Budget", icon="PREVIEW_RANGE")
+        row.prop(props, "time_budget")
+
+        row = box.row()
+        row.label(text="Race", icon="FF")
+        row = row.row(align=True)
+        sub = row.row(align=True)
+        sub.active = props.race
+        sub.prop(props, "race_target")
+        row.prop(props, "race", toggle=True)
 
         split = box.split(factor=0.7)
         if props.use_symmetry:
@@ -375,6 +443,8 @@ class UVGAMI_PT_info(bpy.types.Panel):
             row = box.row()
             row.operator("uvgami.copy_logs", icon="COPYDOWN")
             row.operator("uvgami.clear_logs", icon="TRASH")
+            if manager.telemetry:
+                box.operator("uvgami.export_telemetry", icon="EXPORT")
             col = box.column()
             newline_label(logger.get_all(), col)
         else:
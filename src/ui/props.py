@@ -65,6 +65,26 @@ class UVGAMI_PG_properties(bpy.types.PropertyGroup):
         max=multiprocessing.cpu_count(),
         min=1,
     )
+    auto_cores: bpy.props.BoolProperty(
+        name="Auto",
+        description=(
+            "Choose the number of cores from the current system load."
+            " More meshes are started while the processor has free capacity"
+        ),
+    )
+    priority: bpy.props.EnumProperty(
+        name="",
+        description=(
+            "Queue order of new unwraps."
+            " Higher priority unwraps start before lower ones as soon as a core is free"
+        ),
+        items=(
+            ("HIGH", "High", ""),
+            ("NORMAL", "Normal", ""),
+            ("LOW", "Low", ""),
+        ),
+        default="NORMAL",
+    )
     early_stop: bpy.props.IntProperty(
         name="",
         description=(
@@ -76,6 +96,32 @@ class UVGAMI_PG_properties(bpy.types.PropertyGroup):
         default=100,
         subtype="PERCENTAGE",
     )
+    plateau_stop: bpy.props.BoolProperty(
+        name="Plateau",
+        description=(
+            "Stop the unwrap when the amount of stretching stops improving."
+            " The result is saved as it is when it stops"
+        ),
+    )
+    plateau_window: bpy.props.IntProperty(
+        name="Window",
+        description="How many seconds the unwrap has to stop improving for",
+        min=5,
+        soft_max=600,
+        default=60,
+    )
+    plateau_epsilon: bpy.props.FloatProperty(
+        name="Improvement",
+        description=(
+            "The improvement over the window that still counts as progress,"
+            " as a percentage of the faces that are stretched less"
+        ),
+        min=0,
+        max=100,
+        default=0.5,
+        precision=2,
+        subtype="PERCENTAGE",
+    )
     unwrap_timeout: bpy.props.IntProperty(
         name="",
         description=(
@@ -87,6 +133,42 @@ class UVGAMI_PG_properties(bpy.types.PropertyGroup):
         max=120,
         default=0,
     )
+    time_budget: bpy.props.IntProperty(
+        name="",
+        description=(
+            "Time in minutes for the whole batch. Each unwrap gets a share of it"
+            " by its size and is stopped when the share runs out, keeping the"
+            " result so far. Set to 0 to disable"
+        ),
+        min=0,
+        soft_max=240,
+        default=0,
+    )
+    race: bpy.props.BoolProperty(
+        name="Race",
+        description=(
+            "Use free cores to unwrap running meshes again at lower qualities."
+            " The first result that reaches the target is used"
+        ),
+    )
+    race_target: bpy.props.IntProperty(
+        name="",
+        description=(
+            "The share of faces with low stretching a result needs to win the race"
+        ),
+        min=1,
+        max=100,
+        default=90,
+        subtype="PERCENTAGE",
+    )
+    auto_timeout: bpy.props.BoolProperty(
+        name="Auto",
+        description=(
+            "Time out each unwrap at three times its predicted runtime, but after"
+            " at least a minute. The prediction is based on previous unwraps,"
+            " the timeout above is used until there are any"
+        ),
+    )
     use_cuts: bpy.props.BoolProperty(
         name="",
         description=("Cut the input mesh into pieces. This will speed up the unwrap"),
@@ -232,6 +314,15 @@ class UVGAMI_AP_preferences(bpy.types.AddonPreferences):
         description="The path to the unwrapper application stored on your computer",
         subtype="FILE_PATH",
     )
+    work_dir: bpy.props.StringProperty(
+        name="",
+        description=(
+            "The folder for the files sent to the engine and back, like /dev/shm"
+            " to keep them in memory. If this is empty, missing or almost full,"
+            " the extension folder is used"
+        ),
+        subtype="DIR_PATH",
+    )
     cleanup: bpy.props.EnumProperty(
         name="Input Cleanup",
         description="The action to perform on the original input mesh",
@@ -262,11 +353,50 @@ class UVGAMI_AP_preferences(bpy.types.AddonPreferences):
         max=60,
         default=10,
     )
+    memory_budget: bpy.props.FloatProperty(
+        name="Memory Budget",
+        description=(
+            "The maximum amount of memory in GB that running engines can use."
+            " New unwraps wait in the queue until they fit."
+            " Set to 0 to use the memory available on the system"
+        ),
+        min=0,
+        soft_max=512,
+        default=0,
+        subtype="UNSIGNED",
+    )
+    cache_size: bpy.props.IntProperty(
+        name="Cache Size",
+        description=(
+            "The maximum size in MB of the cache of unwrap results, saved in the"
+            " extension folder. Unwrapping the same mesh with the same settings"
+            " again reuses the result. 0 turns the cache off"
+        ),
+        min=0,
+        soft_max=10240,
+        default=0,
+    )
+    binary_meshes: bpy.props.BoolProperty(
+        name="Binary Meshes",
+        description=(
+            "Send meshes to the engine and back in a binary format instead of OBJ."
+            " This is faster for big meshes, but needs an engine that supports it"
+        ),
+        default=False,
+    )
     show_info: bpy.props.BoolProperty(
         name="Info",
         description="Show information about previous unwraps in the info panel",
         default=True,
     )
+    telemetry: bpy.props.BoolProperty(
+        name="Telemetry",
+        description=(
+            "Record the energy, seam length and timings of every engine iteration."
+            " They can be exported from the info panel after the unwrap"
+        ),
+        default=False,
+    )
     viewer_workspace: bpy.props.StringProperty(
         name="Viewer Workspace",
         description=(
@@ -274,6 +404,17 @@ class UVGAMI_AP_preferences(bpy.types.AddonPreferences):
             " If this is empty, the UV editor will be opened instead"
         ),
     )
+    viewer_overhead: bpy.props.IntProperty(
+        name="Viewer Overhead",
+        description=(
+            "The maximum share of time an engine spends on live viewer updates."
+            " Lower values slow down the viewer less but update it less often"
+        ),
+        min=1,
+        max=100,
+        default=5,
+        subtype="PERCENTAGE",
+    )
     # non ui
     is_wsl_setup: bpy.props.BoolProperty()
 
@@ -303,6 +444,10 @@ class UVGAMI_AP_preferences(bpy.types.AddonPreferences):
             row = box.row()
             row.label(text="Using bundled engine", icon="CHECKMARK")
 
+        split = box.split(factor=0.2)
+        split.label(text="Working Folder")
+        split.prop(self, "work_dir")
+
         box = layout.box()
 
         cf = box.column_flow(columns=3)
@@ -327,6 +472,23 @@ class UVGAMI_AP_preferences(bpy.types.AddonPreferences):
         row.label(icon="INFO")
         row.prop(self, "show_info")
 
+        row = cf.row()
+        row.label(icon="GRAPH")
+        row.prop(self, "telemetry")
+
+        row = cf.row()
+        row.label(icon="MEMORY")
+        row.prop(self, "memory_budget")
+
+        row = cf.row()
+        row.label(icon="FILE_CACHE")
+        row.prop(self, "cache_size")
+        row.operator("uvgami.clear_cache", text="", icon="TRASH")
+
+        row = cf.row()
+        row.label(icon="FILE_BLANK")
+        row.prop(self, "binary_meshes")
+
         row = cf.row()
         row.label(
             icon="OUTLINER_COLLECTION" if bpy.app.version >= (2, 92, 0) else "GROUP"
@@ -351,3 +513,7 @@ class UVGAMI_AP_preferences(bpy.types.AddonPreferences):
         row = box.row()
         row.label(icon="WORKSPACE")
         row.prop(self, "viewer_workspace")
+
+        row = box.row()
+        row.label(icon="HIDE_OFF")
+        row.prop(self, "viewer_overhead")
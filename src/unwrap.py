@@ -2,21 +2,34 @@
 # See __init__.py and LICENSE for more information
 
 import collections
+import os
 import pathlib
 import platform
+import shutil
 import subprocess
-import threading
 import time
 
-import bmesh
 import bpy
 import mathutils
+import numpy
 
+from . import telemetry
+from .convergence import PlateauDetector
+from .history import history
+from .journal import journal
 from .logger import logger
 from .manager import manager
-from .utils.io import print_stdin
-from .utils.mesh import check_exists
-from .utils.paths import get_extension_dir_path, get_linux_path, get_preferences
+from .reader import reader
+from .scheduler import PRIORITIES, QUALITY_BOUNDS, SEAM_WEIGHTS
+from .utils.io import print_stdin, read_mesh, read_snapshot, write_mesh
+from .utils.paths import get_linux_path, get_preferences, get_work_dir_path
+from .utils.system import get_process_rss, resume_process, suspend_process
+from .uv_viewer import (
+    MIN_SNAPSHOT_INTERVAL,
+    SNAPSHOT_TIMEOUT,
+    SNAPSHOT_TOLERANCE,
+    uv_viewer,
+)
 
 
 class Unwrap:
@@ -32,11 +45,13 @@ class Unwrap:
         materials: list,
         added_edges: list,
         vertex_count: int,
+        face_count: int,
         material_indices: list,
         vertex_groups: dict,
         shade_smooth: bool,
         auto_smooth: int,
         merge_cuts: bool,
+        fingerprint: str = None,
     ):
         # unwrap name
         self.name = name
@@ -44,7 +59,9 @@ class Unwrap:
 
         # paths
         self.path = path
-        self.output_path = get_extension_dir_path() / "output" / f"{self.path.stem}.obj"
+        self.output_path = get_work_dir_path() / "output" / self.path.name
+        # binary uvs for the viewer, written by the engine
+        self.snapshot_path = self.output_path.with_suffix(".snapshot")
         # seam restrictions
         self.guide_path = guide_path
         # for untriangulation (added edges)
@@ -62,6 +79,7 @@ class Unwrap:
         self.materials = materials
         self.added_edges = added_edges
         self.vertex_count = vertex_count
+        self.face_count = face_count
         self.material_indices = material_indices
         self.vertex_groups = vertex_groups
         self.shade_smooth = shade_smooth
@@ -70,23 +88,113 @@ class Unwrap:
         # other
         self.merge_cuts = merge_cuts
 
+        # engine settings, stored so queued unwraps keep the settings they
+        # were started with
+        props = bpy.context.scene.uvgami
+        self.quality = props.quality
+        self.seam_weight = props.weight_value
+        self.priority = PRIORITIES[props.priority]
+        # stops the unwrap when it doesn't get better anymore
+        self.plateau = None
+        if props.plateau_stop:
+            self.plateau = PlateauDetector(
+                props.plateau_window, props.plateau_epsilon / 100
+            )
+
         # unwrap state
         self.is_active = False
         self.progress = (0, 0, 1)
         # unwrap process
         self.process = None
-        # copy of input obj used for viewing
-        self.viewer_obj = None
         self.viewing = False
         self.view_update_count = 0
         self.progress_data = collections.deque()
+        # engine telemetry, one record per iteration
+        self.telemetry = collections.deque(maxlen=telemetry.MAX_RECORDS)
         self.uv_co = collections.deque()
         self.uv_indices = collections.deque()
         self.is_uv_data_ready = False
+        # the engine writes the snapshot file once per request, only one
+        # request is sent at a time so the file isn't written while it's read
+        self.is_snapshot_requested = False
+        self.snapshot_requested_at = None
+        self.is_binary_snapshot = False
+        # turned off when the engine doesn't answer delta requests
+        self.use_snapshot_delta = True
+        self.is_delta_requested = False
+        # uvs and face uv indices of the last snapshot, deltas are applied to them
+        self.snapshot_uvs = None
+        self.snapshot_indices = None
+        # seconds the engine took to write the last snapshot
+        self.snapshot_cost = None
+        self.next_snapshot_at = 0
+        self.last_snapshot_at = None
+        # share of engine time spent on snapshots
+        self.snapshot_overhead = 0
         self.is_stopped = False
         self.stop_requested_at = None
+        # when the share of the batch time budget runs out
+        self.budget_deadline = None
+        # a paused engine is suspended, a paused queued unwrap isn't started
+        self.is_paused = False
+        self.paused_at = None
+        # engine memory in bytes, None if it can't be read
+        self.rss = None
+        self.peak_rss = None
+        # result cache
+        self.fingerprint = fingerprint
+        self.cache_key = None
+        self.is_cached = False
+        # identical parts of a join, copies get the uvs of their source
+        self.source = None
+        self.copies = []
+        # world space vertex positions of a copy
+        self.coords = None
+        # the same input at faster qualities, the first good result is used
+        self.racers = []
+        self.race_of = None
+        # share of faces with low stretching that ends the race, None if the
+        # unwrap isn't racing
+        self.race_target = None
+        # the racer whose result was used instead of the unwrap's own
+        self.won_by = None
 
-    def start_unwrap(self):
+    def make_racer(self, quality):
+        """Unwrap of a copy of the input at another quality."""
+        path = self.path.with_name(
+            f"{self.path.stem}_race_{quality.lower()}{self.path.suffix}"
+        )
+        shutil.copyfile(self.path, path)
+        guide_path = None
+        if self.guide_path is not None:
+            # the engine finds the weights by the input name
+            guide_path = path.parent / f"{path.stem}_weights"
+            shutil.copyfile(self.guide_path, guide_path)
+        racer = Unwrap(
+            name=self.name,
+            input_name=self.input_name,
+            path=path,
+            guide_path=guide_path,
+            edge_path=None,
+            jobs=(None, None, None, None),
+            origin=self.origin,
+            materials=self.materials,
+            added_edges=[],
+            vertex_count=self.vertex_count,
+            face_count=self.face_count,
+            material_indices=[],
+            vertex_groups={},
+            shade_smooth=self.shade_smooth,
+            auto_smooth=self.auto_smooth,
+            merge_cuts=self.merge_cuts,
+        )
+        racer.quality = quality
+        racer.seam_weight = self.seam_weight
+        racer.race_of = self
+        self.racers.append(racer)
+        return racer
+
+    def get_engine_path(self):
         prefs = get_preferences()
         # check for valid engine
         engine_path = pathlib.Path(prefs.engine_path)
@@ -96,56 +204,105 @@ class Unwrap:
             or engine_path.stem != "uvgami"
         ):
             engine_path = pathlib.Path(manager.engine_path)
+        return engine_path
 
-        quality = bpy.context.scene.uvgami.quality
-        u = ""
-        if quality == "HIGH":
-            u = "4.05"
-        elif quality == "MEDIUM":
-            u = "4.1"
-        else:
-            u = "4.2"
-
-        s_weight = bpy.context.scene.uvgami.weight_value
-        s = ""
-        if s_weight == 5:
-            s = "200"
-        elif s_weight == 4:
-            s = "150"
-        elif s_weight == 3:
-            s = "100"
-        elif s_weight == 2:
-            s = "50"
-        elif s_weight == 1:
-            s = "25"
+    def get_engine_args(self):
+        """Arguments that change the engine result."""
+        u = QUALITY_BOUNDS[self.quality]
+        s = SEAM_WEIGHTS[self.seam_weight]
+        return ["-u", u, "-s", s]
+
+    def start_unwrap(self):
+        engine_path = self.get_engine_path()
 
         args = []
-        shared_args = f"-u {u} -s {s}"
+        shared_args = " ".join(self.get_engine_args())
 
+        # engines without binary snapshots ignore this and print them instead
+        env = dict(os.environ, UVGAMI_SNAPSHOT_FILE=str(self.snapshot_path))
+        # not an argument, it doesn't change the result or the cache key
+        env["UVGAMI_TELEMETRY"] = "1" if get_preferences().telemetry else "0"
         if platform.system() == "Windows" and engine_path.suffix == "":
             input_path = get_linux_path(self.path)
-            output_path = get_linux_path(get_extension_dir_path() / "output")
+            output_path = get_linux_path(get_work_dir_path() / "output")
+            snapshot_path = get_linux_path(self.snapshot_path)
             args = [
                 "bash",
                 "-c",
+                f"UVGAMI_SNAPSHOT_FILE={snapshot_path} "
+                f"UVGAMI_TELEMETRY={env['UVGAMI_TELEMETRY']} "
                 f"~/uvgami -i {input_path} -o {output_path}/ {shared_args}",
             ]
         else:
             args = [str(engine_path), "-i", str(self.path)] + shared_args.split()
 
+        # unbuffered binary pipes, the output reader splits the lines itself
         self.process = subprocess.Popen(
             args,
             stdout=subprocess.PIPE,
             stdin=subprocess.PIPE,
-            universal_newlines=True,
+            bufsize=0,
+            env=env,
         )
+        reader.add(self)
+
+        self.is_active = True
+        self.started_at = time.monotonic()
+        journal.set_state(self, "running")
 
-        # start reading thread
-        thread = threading.Thread(target=self.get_output)
-        thread.start()
+    def transfer_from(self, source):
+        """Write the output of a copy from the output of its source.
 
+        The engine keeps the input vertex order, so only the positions change.
+        """
+        _, uvs, faces, uv_faces = read_mesh(source.output_path)
+        write_mesh(self.output_path, self.coords, uvs, faces, uv_faces)
+        self.start_cached()
+
+    def start_cached(self):
+        """Finish with an output that was made without an engine."""
         self.is_active = True
+        self.progress = (1, 0, 0)
         self.started_at = time.monotonic()
+        manager.post_event(self, "exited", 0)
+
+    def pause(self):
+        """Returns False if the unwrap can't be paused."""
+        if self.is_paused:
+            return True
+        if self.process is not None:
+            # the wsl process only forwards to the engine inside linux
+            if platform.system() == "Windows" and manager.engine_path.suffix == "":
+                return False
+            if self.process.poll() is not None or not suspend_process(self.process.pid):
+                return False
+        self.is_paused = True
+        self.paused_at = time.monotonic()
+        for racer in self.racers:
+            racer.pause()
+        return True
+
+    def resume(self):
+        if not self.is_paused:
+            return
+        if self.process is not None:
+            resume_process(self.process.pid)
+            # time spent paused doesn't count toward the timeout
+            self.started_at += time.monotonic() - self.paused_at
+        if self.plateau is not None:
+            # no progress while paused isn't a plateau
+            self.plateau.reset()
+        self.is_paused = False
+        self.paused_at = None
+        for racer in self.racers:
+            racer.resume()
+
+    def get_runtime(self):
+        """Seconds the unwrap has been running, without the time it was paused."""
+        if not hasattr(self, "started_at"):
+            return 0
+        end = self.paused_at if self.is_paused else time.monotonic()
+        return end - self.started_at
 
     def stop_process(self):
         if self.process is not None and self.process.poll() is None:
@@ -156,17 +313,34 @@ class Unwrap:
                 # windows
                 self.process.kill()
 
-    def get_output(self):
-        # get lines until there are no more left
-        for line in iter(self.process.stdout.readline, ""):
+    def handle_output(self, lines):
+        """Called by the output reader with the new lines of engine output."""
+        has_progress = False
+        for line in lines:
             if line.startswith("progress: "):
                 self.progress_data.append(line[10:])
-            elif line == "visual_begin:\n":
+                has_progress = True
+            elif line.startswith("telemetry: "):
+                record = telemetry.parse_line(line[11:])
+                if record is not None:
+                    self.telemetry.append(record)
+            elif line == "visual_begin:":
                 self.uv_co.clear()
                 self.uv_indices.clear()
                 self.is_uv_data_ready = False
-            elif line == "visual_end:\n":
+            elif line == "visual_end:":
+                self.is_binary_snapshot = False
                 self.is_uv_data_ready = True
+                manager.post_event(self, "snapshot")
+            elif line.startswith("snapshot_ready:"):
+                try:
+                    self.snapshot_cost = float(line[15:])
+                except ValueError:
+                    # older engines don't send the time
+                    self.snapshot_cost = None
+                self.is_binary_snapshot = True
+                self.is_uv_data_ready = True
+                manager.post_event(self, "snapshot")
             elif line.startswith("vt"):
                 uv_co = line[3:].split()
                 self.uv_co.append((float(uv_co[0]), float(uv_co[1])))
@@ -175,12 +349,19 @@ class Unwrap:
                 self.uv_indices.append(
                     (int(uv_indices[0]), int(uv_indices[1]), int(uv_indices[2]))
                 )
-        # process has ended, thread will exit here
+        # one event for all progress lines that arrived together
+        if has_progress:
+            manager.post_event(self, "progress")
+
+    def handle_exit(self, ret_code):
+        """Called by the output reader when stdout is closed."""
+        manager.post_event(self, "exited", ret_code)
 
     def update_progress(self):
-        """Read progress from the stdout reader thread."""
+        """Read progress from the output reader."""
         if len(self.progress_data) > 0:
-            progress = self.progress_data.popleft()
+            # only the latest progress matters
+            progress = self.progress_data.pop()
             try:
                 self.progress = tuple(float(num) for num in progress.split())
             except ValueError:
@@ -188,35 +369,98 @@ class Unwrap:
                 return
             self.progress_data.clear()
 
+    def update_memory(self):
+        """Sample the resident memory of the engine process."""
+        if self.process is None:
+            return
+        self.rss = get_process_rss(self.process.pid)
+        if self.rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, self.rss)
+
     def update_viewer(self):
-        print_stdin(self.process, "snapshot")
-        if self.is_uv_data_ready:
-            uvs = list(self.uv_co)
-            uv_idcs = list(self.uv_indices)
-            self.is_uv_data_ready = False
-
-            # need to use from_edit_mesh here so mesh is updated in edit mode
-            bm = bmesh.from_edit_mesh(self.viewer_obj.data)
-            uv_map = bm.loops.layers.uv.verify()
-
-            for face in bm.faces:
-                # set uvs
-                uv_idx_triple = uv_idcs[face.index]
-                face.loops[0][uv_map].uv = uvs[uv_idx_triple[0]]
-                face.loops[1][uv_map].uv = uvs[uv_idx_triple[1]]
-                face.loops[2][uv_map].uv = uvs[uv_idx_triple[2]]
-
-            # need to use update_edit_mesh, don't call bm.free(), it will crash
-            bmesh.update_edit_mesh(self.viewer_obj.data)
+        now = time.monotonic()
+        if self.is_paused:
+            # a suspended engine can't answer, wait again once it's resumed
+            self.snapshot_requested_at = now
+        elif (
+            self.is_snapshot_requested
+            and now - self.snapshot_requested_at > SNAPSHOT_TIMEOUT
+        ):
+            # older engines ignore delta requests, use full snapshots instead
+            if self.is_delta_requested:
+                self.use_snapshot_delta = False
+            self.is_snapshot_requested = False
+        if not self.is_snapshot_requested and now >= self.next_snapshot_at:
+            self.is_delta_requested = (
+                self.use_snapshot_delta and self.snapshot_uvs is not None
+            )
+            if self.is_delta_requested:
+                # only the uvs that moved since the last snapshot
+                msg = f"snapshot_delta {SNAPSHOT_TOLERANCE}"
+            else:
+                msg = "snapshot"
+            self.is_snapshot_requested = print_stdin(self.process, msg)
+            self.snapshot_requested_at = now
+        if not self.is_uv_data_ready:
+            return
+
+        apply_start = time.perf_counter()
+        engine_cost = None
+        if self.is_binary_snapshot:
+            snapshot = read_snapshot(self.snapshot_path)
+            engine_cost = self.snapshot_cost
+        else:
+            uvs = numpy.array(self.uv_co, dtype=numpy.float32).reshape(-1, 2)
+            uv_idcs = numpy.array(self.uv_indices, dtype=numpy.int32).reshape(-1, 3)
+            snapshot = uvs, uv_idcs, None
+        self.is_uv_data_ready = False
+        self.is_snapshot_requested = False
+        # a delta needs the uvs it was made from
+        if snapshot is None or (snapshot[2] is not None and self.snapshot_uvs is None):
+            # the engine's uvs are ahead now, the next snapshot has to be full
+            self.snapshot_uvs = None
+            return
+        uvs, uv_idcs, uv_ids = snapshot
+
+        if uv_ids is None:
+            self.snapshot_uvs = uvs
+            self.snapshot_indices = uv_idcs
+        else:
+            self.snapshot_uvs[uv_ids] = uvs
+        uv_viewer.update(self.snapshot_uvs, self.snapshot_indices)
+
+        # wait long enough that the snapshots stay under the overhead limit,
+        # both for the engine and for blender applying them
+        max_overhead = get_preferences().viewer_overhead / 100
+        cost = max(engine_cost or 0, time.perf_counter() - apply_start)
+        interval = max(cost / max_overhead, MIN_SNAPSHOT_INTERVAL)
+        self.next_snapshot_at = time.monotonic() + interval - cost
+        if engine_cost is not None and self.last_snapshot_at is not None:
+            self.snapshot_overhead = engine_cost / (now - self.last_snapshot_at)
+            uv_viewer.info = f"viewer overhead {self.snapshot_overhead:.1%}"
+        self.last_snapshot_at = now
 
     def cleanup(self):
-        """Clean up files and viewer objects."""
+        """Clean up files."""
+        history.forget(self)
         try:
             if self.path.is_file():
                 self.path.unlink()
             if self.guide_path is not None and self.guide_path.is_file():
                 self.guide_path.unlink()
+            if self.snapshot_path.is_file():
+                self.snapshot_path.unlink()
         except PermissionError:
             logger.add_data("errors", "Error deleting file")
-        if self.viewer_obj is not None and check_exists(self.viewer_obj):
-            bpy.data.objects.remove(self.viewer_obj, do_unlink=True)
+        if self.telemetry:
+            manager.telemetry.append(
+                {
+                    "name": self.name,
+                    "input_name": self.input_name,
+                    "face_count": self.face_count,
+                    "quality": self.quality,
+                    "is_stopped": self.is_stopped,
+                    "records": list(self.telemetry),
+                }
+            )
+            self.telemetry.clear()
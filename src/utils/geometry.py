@@ -1,3 +1,4 @@
+import hashlib
 import math
 
 import bmesh
@@ -75,3 +76,47 @@ def cut_on_axes(obj, obj_center, axes):
     # there will be duplicates
     bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
     set_bmesh(bm, obj)
+
+
+def get_world_coords(obj):
+    """Vertex positions in world space as an (n, 3) array."""
+    co = numpy.empty(len(obj.data.vertices) * 3, dtype=numpy.float64)
+    obj.data.vertices.foreach_get("co", co)
+    matrix = numpy.array(obj.matrix_world)
+    return co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def shape_signature(obj, coords, precision=4):
+    """Hash of a mesh shape that doesn't change when the mesh is moved or rotated.
+
+    Meshes with the same signature have the same topology and vertex order,
+    so data can be copied between them by vertex index.
+    """
+    mesh = obj.data
+    loop_totals = numpy.empty(len(mesh.polygons), dtype=numpy.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    loops = numpy.empty(len(mesh.loops), dtype=numpy.int32)
+    mesh.loops.foreach_get("vertex_index", loops)
+    edges = numpy.empty(len(mesh.edges) * 2, dtype=numpy.int32)
+    mesh.edges.foreach_get("vertices", edges)
+    edges = edges.reshape(-1, 2)
+
+    centered = coords - coords.mean(axis=0)
+    radii = numpy.linalg.norm(centered, axis=1)
+    size = max(radii.max(), 1e-12)
+    lengths = numpy.linalg.norm(coords[edges[:, 0]] - coords[edges[:, 1]], axis=1)
+    # signed volume of the first triangle of each face with the center
+    # a mirrored copy has the opposite sign, a bent copy has different volumes
+    starts = numpy.cumsum(loop_totals) - loop_totals
+    a, b, c = (centered[loops[starts + i]] for i in range(3))
+    volumes = numpy.einsum("ij,ij->i", a, numpy.cross(b, c))
+
+    digest = hashlib.sha256()
+    for data in (loop_totals, loops, edges):
+        digest.update(data.tobytes())
+    # relative to the size so float error in a rotated copy still matches
+    # adding 0.0 turns -0.0 into 0.0
+    for data in (radii / size, lengths / size, volumes / size**3):
+        digest.update((numpy.round(data, precision) + 0.0).tobytes())
+    digest.update(numpy.round(numpy.float64(size), precision + 2).tobytes())
+    return digest.hexdigest()
@@ -1,9 +1,60 @@
+import mmap
+
 import bpy
+import numpy
+
+from .geometry import get_world_coords
+from .mesh import new_mesh_object
+
+# binary snapshot header: magic, version, uv count, face count
+SNAPSHOT_MAGIC = 0x53475655
+# delta snapshot header: magic, version, uv count, changed count
+SNAPSHOT_DELTA_MAGIC = 0x44475655
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = 16
+# binary mesh header: magic, version, vertex count, face count, uv count, reserved
+MESH_MAGIC = 0x4D475655
+MESH_VERSION = 1
+MESH_HEADER = 24
+MESH_SUFFIX = ".uvgm"
+
+
+def export_mesh(obj, path, export_uv):
+    """Write the triangle mesh of an object for the engine, in world space.
+
+    Vertices and faces keep the mesh order, so added edges, seam weights and
+    material indices still match. Modifiers aren't applied.
+    """
+    mesh = obj.data
+    faces = numpy.empty(len(mesh.loops), dtype=numpy.int32)
+    mesh.loops.foreach_get("vertex_index", faces)
+    faces = faces.reshape(-1, 3)
+
+    uvs = numpy.empty((0, 2))
+    uv_faces = None
+    uv_layer = mesh.uv_layers.active
+    if export_uv and uv_layer is not None:
+        loop_uvs = numpy.empty(len(mesh.loops) * 2, dtype=numpy.float32)
+        uv_layer.data.foreach_get("uv", loop_uvs)
+        # loops of a vertex with the same uv share it, like the obj exporter,
+        # so the engine sees the same uv islands
+        keys = numpy.column_stack((faces.ravel(), loop_uvs.reshape(-1, 2)))
+        keys, uv_faces = numpy.unique(keys, axis=0, return_inverse=True)
+        uvs = keys[:, 1:]
+        uv_faces = uv_faces.reshape(-1, 3)
+
+    write_mesh(path, get_world_coords(obj), uvs, faces, uv_faces)
+
 
+def export_objects(objects, path, export_uv):
+    for obj in objects:
+        obj.select_set(True)
+    _export_selected(path, export_uv)
+    for obj in objects:
+        obj.select_set(False)
 
-def export_obj(obj, path, export_uv):
-    obj.select_set(True)
 
+def _export_selected(path, export_uv):
     if bpy.app.version >= (3, 1, 0):
         # new obj exporter
         args = {
@@ -43,59 +94,216 @@ def export_obj(obj, path, export_uv):
             axis_up="Z",
         )
 
-    obj.select_set(False)
-
-
-def import_obj(path, name=""):
-    before = set(bpy.context.scene.objects)
-    previous_select = bpy.context.selected_objects
 
-    # blender 3.1 doesn't have the new importer
+def import_objects(path):
+    """Import an obj file with the axes it's exported with."""
     if bpy.app.version >= (3, 2, 0):
         # new obj importer
-        forward = "Y"
-        up = "Z"
+        args = {"filepath": str(path), "forward_axis": "Y", "up_axis": "Z"}
+
         if bpy.app.version < (3, 3, 0):
-            # axis names renamed
-            forward = "Y_FORWARD"
-            up = "Z_UP"
+            # axis enums were renamed
+            args["forward_axis"] = "Y_FORWARD"
+            args["up_axis"] = "Z_UP"
 
-        bpy.ops.wm.obj_import(
-            "EXEC_DEFAULT", filepath=str(path), forward_axis=forward, up_axis=up
-        )
+        bpy.ops.wm.obj_import("EXEC_DEFAULT", **args)
 
     else:
         # old
         bpy.ops.import_scene.obj(
             "EXEC_DEFAULT",
             filepath=str(path),
-            split_mode="OFF",
             axis_forward="Y",
             axis_up="Z",
         )
-    # push to undo stack
-    bpy.ops.ed.undo_push()
 
-    after = set(bpy.context.scene.objects)
 
-    # get imported object
-    imported_obj = after.difference(before).pop()
-    imported_obj.select_set(False)
+def import_mesh(path, name=""):
+    """Make an object from a mesh file without the import operator.
 
-    for obj in previous_select:
-        obj.select_set(True)
+    The selection and active object don't change.
+    """
+    return new_mesh_object(name or path.stem, *read_mesh(path))
 
-    if name != "":
-        imported_obj.name = name
 
-    return imported_obj
+def read_mesh(path):
+    """Read a binary mesh or a triangle OBJ, by the suffix of the path.
+
+    Returns the arrays of read_obj.
+    """
+    if path.suffix != MESH_SUFFIX:
+        return read_obj(path)
+    data = numpy.fromfile(path, dtype=numpy.uint8)
+    if len(data) < MESH_HEADER:
+        raise ValueError(f"{path.name} isn't a UVgami mesh")
+    magic, version, v_count, f_count, uv_count, _ = (
+        data[:MESH_HEADER].view("<i4").tolist()
+    )
+    if magic != MESH_MAGIC or version != MESH_VERSION:
+        raise ValueError(f"{path.name} isn't a UVgami mesh")
+    sizes = (
+        ("<f8", v_count * 3),
+        ("<f8", uv_count * 2),
+        ("<i4", f_count * 3),
+        ("<i4", f_count * 3 if uv_count > 0 else 0),
+    )
+    arrays = []
+    offset = MESH_HEADER
+    for dtype, count in sizes:
+        end = offset + count * numpy.dtype(dtype).itemsize
+        arrays.append(data[offset:end].view(dtype))
+        offset = end
+    if offset > len(data):
+        raise ValueError(f"{path.name} is incomplete")
+    vertices, uvs, faces, uv_faces = arrays
+    return (
+        vertices.reshape(-1, 3),
+        uvs.reshape(-1, 2),
+        faces.reshape(-1, 3),
+        uv_faces.reshape(-1, 3),
+    )
+
+
+def write_mesh(path, vertices, uvs, faces, uv_faces):
+    """Write a binary mesh or a triangle OBJ, by the suffix of the path."""
+    if path.suffix != MESH_SUFFIX:
+        write_obj(path, vertices, uvs, faces, uv_faces)
+        return
+    has_uvs = len(uvs) > 0
+    header = (MESH_MAGIC, MESH_VERSION, len(vertices), len(faces), len(uvs), 0)
+    with open(path, "wb") as f:
+        f.write(numpy.array(header, dtype="<i4").tobytes())
+        # doubles first, so they stay aligned
+        f.write(numpy.ascontiguousarray(vertices, dtype="<f8").tobytes())
+        if has_uvs:
+            f.write(numpy.ascontiguousarray(uvs, dtype="<f8").tobytes())
+        f.write(numpy.ascontiguousarray(faces, dtype="<i4").tobytes())
+        if has_uvs:
+            f.write(numpy.ascontiguousarray(uv_faces, dtype="<i4").tobytes())
+
+
+def read_obj(path):
+    """Read a triangle OBJ into arrays, indices start at 0.
+
+    Returns vertices (n, 3), uvs (k, 2), face vertex indices (m, 3) and face
+    uv indices (m, 3). Without uvs, the uv arrays are empty.
+    """
+    with open(path) as f:
+        lines = f.read().splitlines()
+    vertices = _read_values(lines, "v ", numpy.float64).reshape(-1, 3)
+    uvs = _read_values(lines, "vt ", numpy.float64).reshape(-1, 2)
+    faces = _read_values(lines, "f ", numpy.int32)
+    if len(uvs) > 0:
+        # v/vt pairs, obj indices start at 1
+        faces = faces.reshape(-1, 3, 2) - 1
+        return vertices, uvs, faces[:, :, 0], faces[:, :, 1]
+    return vertices, uvs, faces.reshape(-1, 3) - 1, numpy.empty((0, 3), numpy.int32)
+
+
+def _read_values(lines, prefix, dtype):
+    """All numbers of the lines that start with prefix, as one flat array."""
+    text = " ".join(line[len(prefix) :] for line in lines if line.startswith(prefix))
+    if prefix == "f ":
+        text = text.replace("/", " ")
+    # parsed in c, much faster than converting each number in python
+    return numpy.fromstring(text, dtype=dtype, sep=" ")
+
+
+def write_obj(path, vertices, uvs, faces, uv_faces):
+    """Write a triangle OBJ from arrays, indices start at 0.
+
+    Floats are written like the engine writes them. Faces don't reference
+    uvs if uvs is empty.
+    """
+    parts = [_format_rows("v %e %e %e\n", vertices)]
+    if len(uvs) > 0:
+        parts.append(_format_rows("vt %e %e\n", uvs))
+        pairs = numpy.stack((faces, uv_faces), axis=2).reshape(-1, 6)
+        parts.append(_format_rows("f %d/%d %d/%d %d/%d\n", pairs + 1))
+    else:
+        parts.append(_format_rows("f %d %d %d\n", faces + 1))
+    with open(path, "w") as f:
+        f.writelines(parts)
+
+
+def _format_rows(row, values):
+    # one format call for the whole array instead of one per row
+    return (row * len(values)) % tuple(values.ravel().tolist())
 
 
 def print_stdin(process, msg):
-    if process.poll() is not None:
+    # cached unwraps don't have a process
+    if process is None or process.poll() is not None:
         return False
     try:
-        print(msg, file=process.stdin, flush=True)
+        process.stdin.write(f"{msg}\n".encode())
+        process.stdin.flush()
     except OSError:
         return False
     return True
+
+
+def read_snapshot(path):
+    """Map a binary engine snapshot, returns uvs, face uv indices and uv ids.
+
+    A full snapshot has uvs (n, 2), face uv indices (m, 3) and no uv ids.
+    A delta has only the uvs that moved, uv ids are their indices and there
+    are no face uv indices. Returns None if the file is missing or incomplete.
+    """
+    try:
+        with path.open("rb") as f:
+            if path.stat().st_size < SNAPSHOT_HEADER:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                magic, version, uv_count, count = numpy.frombuffer(
+                    m, dtype=numpy.int32, count=4
+                ).tolist()
+                if version != SNAPSHOT_VERSION:
+                    return None
+                if magic == SNAPSHOT_MAGIC:
+                    size = SNAPSHOT_HEADER + uv_count * 2 * 4 + count * 3 * 4
+                elif magic == SNAPSHOT_DELTA_MAGIC:
+                    size = SNAPSHOT_HEADER + count * 4 + count * 2 * 4
+                else:
+                    return None
+                if len(m) < size:
+                    return None
+                # copied so the map can be closed, the engine rewrites the file
+                if magic == SNAPSHOT_DELTA_MAGIC:
+                    uv_ids = numpy.frombuffer(
+                        m, dtype=numpy.int32, count=count, offset=SNAPSHOT_HEADER
+                    ).copy()
+                    uvs = (
+                        numpy.frombuffer(
+                            m,
+                            dtype=numpy.float32,
+                            count=count * 2,
+                            offset=SNAPSHOT_HEADER + count * 4,
+                        )
+                        .reshape(-1, 2)
+                        .copy()
+                    )
+                    return uvs, None, uv_ids
+                uvs = (
+                    numpy.frombuffer(
+                        m,
+                        dtype=numpy.float32,
+                        count=uv_count * 2,
+                        offset=SNAPSHOT_HEADER,
+                    )
+                    .reshape(-1, 2)
+                    .copy()
+                )
+                indices = (
+                    numpy.frombuffer(
+                        m,
+                        dtype=numpy.int32,
+                        count=count * 3,
+                        offset=SNAPSHOT_HEADER + uv_count * 2 * 4,
+                    )
+                    .reshape(-1, 3)
+                    .copy()
+                )
+    except (OSError, ValueError):
+        return None
+    return uvs, indices, None
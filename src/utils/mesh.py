@@ -1,5 +1,6 @@
 import bmesh
 import bpy
+import numpy
 
 
 def new_bmesh(obj):
@@ -16,6 +17,35 @@ def set_bmesh(bm, obj):
     bm.free()
 
 
+def new_mesh_object(name, vertices, uvs, faces, uv_faces):
+    """Make a triangle mesh object from arrays, like the ones of read_mesh.
+
+    The object is linked to the active collection, there are no uvs if uvs
+    is empty.
+    """
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", vertices.astype(numpy.float32).ravel())
+    mesh.loops.add(faces.size)
+    mesh.loops.foreach_set("vertex_index", faces.astype(numpy.int32).ravel())
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set("loop_start", numpy.arange(0, faces.size, 3))
+    if bpy.app.version < (4, 0, 0):
+        # read only since 4.0, it comes from the loop starts
+        mesh.polygons.foreach_set("loop_total", numpy.full(len(faces), 3))
+    # flat like the obj importer, faces are smooth by default since 4.1
+    mesh.polygons.foreach_set("use_smooth", numpy.zeros(len(faces), dtype=bool))
+    if len(uvs) > 0:
+        uv_layer = mesh.uv_layers.new(name="UVMap")
+        loop_uvs = uvs[uv_faces.ravel()].astype(numpy.float32)
+        uv_layer.data.foreach_set("uv", loop_uvs.ravel())
+    mesh.update(calc_edges=True)
+
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.view_layer.active_layer_collection.collection.objects.link(obj)
+    return obj
+
+
 def move_to_collection(obj, target):
     for collection in obj.users_collection:
         collection.objects.unlink(obj)
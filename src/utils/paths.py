@@ -1,8 +1,15 @@
 import pathlib
 import platform
+import shutil
 
 import bpy
 
+# bytes that have to be free in the working folder, otherwise the extension
+# folder is used
+MIN_WORK_SPACE = 512 * 1024**2
+
+_work_dir = None
+
 
 def get_dir_path():
     return pathlib.Path(__file__).parents[2]
@@ -37,6 +44,34 @@ def get_extension_dir_path():
     return extension_folder
 
 
+def get_work_dir_path(refresh=False):
+    """The folder of the engine input and output folders.
+
+    This is the working folder preference if it can be used, otherwise the
+    extension folder. It's only resolved again with refresh, so a batch
+    keeps the same folder until it's done.
+    """
+    global _work_dir
+    if _work_dir is None or refresh:
+        _work_dir = _resolve_work_dir()
+    return _work_dir
+
+
+def _resolve_work_dir():
+    work_dir = get_preferences().work_dir
+    if work_dir:
+        # a subfolder, the input and output folders are emptied
+        path = pathlib.Path(bpy.path.abspath(work_dir)) / "uvgami"
+        try:
+            path.mkdir(exist_ok=True)
+            if shutil.disk_usage(path).free >= MIN_WORK_SPACE:
+                return path
+            print(f"UVgami: Not enough space in {path}, using the extension folder")
+        except OSError as e:
+            print(f"UVgami: Can't use the working folder: {e}")
+    return get_extension_dir_path()
+
+
 def get_linux_path(path):
     return f'"/mnt/c{str(pathlib.PurePosixPath(path))[3:]}"'
 
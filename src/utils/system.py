@@ -0,0 +1,113 @@
+import os
+import pathlib
+import platform
+import signal
+
+PROC = pathlib.Path("/proc")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def has_proc():
+    """Process info is only available on Linux."""
+    return (PROC / "meminfo").is_file()
+
+
+def _read_kb_fields(path, fields):
+    """Read "Name: value kB" lines from a /proc file, values are in bytes."""
+    values = {}
+    try:
+        with path.open() as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    values[name] = int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return values
+
+
+def get_process_rss(pid):
+    """Resident memory of a process in bytes, None if unknown."""
+    return _read_kb_fields(PROC / str(pid) / "status", {"VmRSS"}).get("VmRSS")
+
+
+def get_memory_info():
+    """Total and available system memory in bytes, None if unknown."""
+    info = _read_kb_fields(PROC / "meminfo", {"MemTotal", "MemAvailable"})
+    if "MemTotal" not in info or "MemAvailable" not in info:
+        return None
+    return info["MemTotal"], info["MemAvailable"]
+
+
+def get_load_average():
+    """One minute load average, None if unknown."""
+    try:
+        with (PROC / "loadavg").open() as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def get_cpu_times():
+    """Busy and total CPU time of the whole system in clock ticks."""
+    try:
+        with (PROC / "stat").open() as f:
+            # first line: cpu user nice system idle iowait irq softirq steal ...
+            values = [int(v) for v in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    idle = values[3] + (values[4] if len(values) > 4 else 0)
+    total = sum(values[:8])
+    return total - idle, total
+
+
+def get_process_cpu_time(pid):
+    """User and system CPU time of a process in seconds, None if unknown."""
+    try:
+        with (PROC / str(pid) / "stat").open() as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # the process name can contain spaces, fields start after the last ")"
+    fields = stat[stat.rfind(")") + 2 :].split()
+    try:
+        # utime and stime are fields 14 and 15 of the full line
+        ticks = int(fields[11]) + int(fields[12])
+    except (ValueError, IndexError):
+        return None
+    return ticks / CLOCK_TICKS
+
+
+def suspend_process(pid):
+    """Pause a process until resume_process, returns False if it failed."""
+    if platform.system() == "Windows":
+        return _call_nt_process(pid, "NtSuspendProcess")
+    return _send_signal(pid, signal.SIGSTOP)
+
+
+def resume_process(pid):
+    if platform.system() == "Windows":
+        return _call_nt_process(pid, "NtResumeProcess")
+    return _send_signal(pid, signal.SIGCONT)
+
+
+def _send_signal(pid, sig):
+    try:
+        os.kill(pid, sig)
+    except OSError:
+        return False
+    return True
+
+
+def _call_nt_process(pid, function):
+    import ctypes
+
+    PROCESS_SUSPEND_RESUME = 0x0800
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(PROCESS_SUSPEND_RESUME, False, pid)
+    if not handle:
+        return False
+    try:
+        return getattr(ctypes.windll.ntdll, function)(handle) == 0
+    finally:
+        kernel32.CloseHandle(handle)
@@ -7,6 +7,11 @@ def newline_label(label, layout):
 
 
 def popup(msg, title, icon):
+    if bpy.app.background:
+        # there is no window to show the popup in
+        print(f"{title}: " + "\n".join(msg))
+        return
+
     def draw(self, context):
         newline_label(msg, self.layout)
 
@@ -0,0 +1,118 @@
+# Copyright (C) 2022 Daniel Boxer
+# See __init__.py and LICENSE for more information
+
+import blf
+import bpy
+import gpu
+import numpy
+from gpu_extras.batch import batch_for_shader
+
+from .progress_bar import get_shader
+
+EDGE_COLOUR = (1.0, 1.0, 1.0, 1.0)
+BOUNDS_COLOUR = (0.4, 0.4, 0.4, 1.0)
+TEXT_COLOUR = (1.0, 1.0, 1.0, 1.0)
+TEXT_SIZE = 14
+MARGIN = 20
+BOUNDS = ((0, 0), (1, 0), (1, 0), (1, 1), (1, 1), (0, 1), (0, 1), (0, 0))
+# seconds between snapshots at the least, when they are cheap
+MIN_SNAPSHOT_INTERVAL = 0.1
+# uvs that moved less than this aren't sent again, a pixel of a 1024 texture
+SNAPSHOT_TOLERANCE = 1 / 1024
+# seconds to wait for a snapshot before asking again, engines without
+# deltas never answer a delta request
+SNAPSHOT_TIMEOUT = 10
+
+
+class UVViewer:
+    """Draw the latest snapshot of an unwrap in the image editor.
+
+    The uv edges are drawn from a GPU batch, there is no viewer object and
+    no mode change, so switching between unwraps only changes the batch.
+    """
+
+    def __init__(self):
+        self._handle = None
+        self._batch = None
+        self._bounds = None
+        # edges are only found again when the faces change
+        self._indices = None
+        self._edges = None
+        self.title = ""
+        self.info = ""
+        self.is_active = False
+
+    def start(self):
+        if self.is_active:
+            return
+        self.is_active = True
+        self._handle = bpy.types.SpaceImageEditor.draw_handler_add(
+            self._draw, (), "WINDOW", "POST_PIXEL"
+        )
+
+    def update(self, uvs, indices):
+        """Make the batch from snapshot uvs (n, 2) and face uv indices (m, 3)."""
+        if len(indices) == 0:
+            return
+        if indices is not self._indices:
+            # each edge of a triangle, shared edges are only drawn once
+            edges = indices[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+            self._edges = numpy.unique(numpy.sort(edges, axis=1), axis=0)
+            self._indices = indices
+        self._batch = batch_for_shader(
+            get_shader(), "LINES", {"pos": uvs}, indices=self._edges
+        )
+        self.redraw()
+
+    def clear(self):
+        self._batch = None
+        self.info = ""
+        self.redraw()
+
+    def redraw(self):
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == "IMAGE_EDITOR":
+                    area.tag_redraw()
+
+    def remove(self):
+        if self.is_active:
+            self.is_active = False
+            bpy.types.SpaceImageEditor.draw_handler_remove(self._handle, "WINDOW")
+            self._batch = None
+            self.redraw()
+
+    def _draw(self):
+        region = bpy.context.region
+        if self._bounds is None:
+            self._bounds = batch_for_shader(get_shader(), "LINES", {"pos": BOUNDS})
+
+        # map uv space to the pixels of the region, so the batch doesn't
+        # need to be made again when the view is moved or zoomed
+        origin = region.view2d.view_to_region(0, 0, clip=False)
+        corner = region.view2d.view_to_region(1, 1, clip=False)
+        shader = get_shader()
+        with gpu.matrix.push_pop():
+            gpu.matrix.translate(origin)
+            gpu.matrix.scale((corner[0] - origin[0], corner[1] - origin[1]))
+            shader.bind()
+            shader.uniform_float("color", BOUNDS_COLOUR)
+            self._bounds.draw(shader)
+            if self._batch is not None:
+                shader.uniform_float("color", EDGE_COLOUR)
+                self._batch.draw(shader)
+
+        font_id = 0
+        if bpy.app.version >= (4, 0, 0):
+            blf.size(font_id, TEXT_SIZE)
+        else:
+            blf.size(font_id, TEXT_SIZE, 72)
+        blf.color(font_id, *TEXT_COLOUR)
+        blf.position(font_id, MARGIN, region.height - MARGIN - TEXT_SIZE, 0)
+        if self._batch is None:
+            blf.draw(font_id, f"{self.title} (waiting)")
+        else:
+            blf.draw(font_id, f"{self.title}  {self.info}")
+
+
+uv_viewer = UVViewer()
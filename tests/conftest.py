@@ -0,0 +1,11 @@
+import pathlib
+import sys
+import types
+
+# import the modules as the src package, without the add-on's __init__.py
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+# blender's modules are imported at the top of the add-on modules, the code
+# under test doesn't use them
+for name in ("bpy", "bmesh", "mathutils"):
+    sys.modules.setdefault(name, types.ModuleType(name))
@@ -0,0 +1,109 @@
+import numpy
+import pytest
+
+from src.utils.io import (
+    MESH_HEADER,
+    MESH_SUFFIX,
+    read_mesh,
+    read_obj,
+    write_mesh,
+    write_obj,
+)
+
+VERTICES = numpy.array(
+    ((0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0.5)), dtype=numpy.float64
+)
+FACES = numpy.array(((0, 1, 2), (0, 2, 3)), dtype=numpy.int32)
+UVS = numpy.array(((0, 0), (1, 0), (1, 1), (0, 1), (0.5, 0.25)), dtype=numpy.float64)
+UV_FACES = numpy.array(((0, 1, 2), (4, 2, 3)), dtype=numpy.int32)
+NO_UVS = numpy.empty((0, 2), numpy.float64)
+NO_UV_FACES = numpy.empty((0, 3), numpy.int32)
+
+
+def check_mesh(result, vertices, uvs, faces, uv_faces):
+    read_vertices, read_uvs, read_faces, read_uv_faces = result
+    # obj floats are written with 7 significant digits
+    numpy.testing.assert_allclose(read_vertices, vertices, atol=1e-6)
+    numpy.testing.assert_allclose(read_uvs.reshape(-1, 2), uvs, atol=1e-6)
+    numpy.testing.assert_array_equal(read_faces, faces)
+    numpy.testing.assert_array_equal(read_uv_faces.reshape(-1, 3), uv_faces)
+
+
+@pytest.mark.parametrize("suffix", (MESH_SUFFIX, ".obj"))
+def test_round_trip_with_uvs(tmp_path, suffix):
+    path = tmp_path / f"mesh{suffix}"
+    write_mesh(path, VERTICES, UVS, FACES, UV_FACES)
+    check_mesh(read_mesh(path), VERTICES, UVS, FACES, UV_FACES)
+
+
+@pytest.mark.parametrize("suffix", (MESH_SUFFIX, ".obj"))
+def test_round_trip_without_uvs(tmp_path, suffix):
+    path = tmp_path / f"mesh{suffix}"
+    write_mesh(path, VERTICES, NO_UVS, FACES, NO_UV_FACES)
+    check_mesh(read_mesh(path), VERTICES, NO_UVS, FACES, NO_UV_FACES)
+
+
+def test_binary_is_exact(tmp_path):
+    path = tmp_path / f"mesh{MESH_SUFFIX}"
+    vertices = VERTICES + 1 / 3
+    write_mesh(path, vertices, UVS, FACES, UV_FACES)
+    numpy.testing.assert_array_equal(read_mesh(path)[0], vertices)
+
+
+def test_obj_round_trip(tmp_path):
+    path = tmp_path / "mesh.obj"
+    write_obj(path, VERTICES, UVS, FACES, UV_FACES)
+    check_mesh(read_obj(path), VERTICES, UVS, FACES, UV_FACES)
+
+
+def test_obj_format(tmp_path):
+    path = tmp_path / "mesh.obj"
+    write_obj(path, VERTICES[:3], UVS[:3], FACES[:1], UV_FACES[:1])
+    lines = path.read_text().splitlines()
+    assert lines[0].split() == ["v", "0.000000e+00", "0.000000e+00", "0.000000e+00"]
+    # obj indices start at 1
+    assert lines[-1] == "f 1/1 2/2 3/3"
+
+
+def test_empty_mesh_round_trip(tmp_path):
+    vertices = numpy.empty((0, 3), numpy.float64)
+    faces = numpy.empty((0, 3), numpy.int32)
+    for suffix in (MESH_SUFFIX, ".obj"):
+        path = tmp_path / f"mesh{suffix}"
+        write_mesh(path, vertices, NO_UVS, faces, NO_UV_FACES)
+        check_mesh(read_mesh(path), vertices, NO_UVS, faces, NO_UV_FACES)
+
+
+def test_empty_obj_file(tmp_path):
+    path = tmp_path / "mesh.obj"
+    path.write_text("")
+    vertices, uvs, faces, uv_faces = read_obj(path)
+    assert vertices.shape == (0, 3)
+    assert uvs.shape == (0, 2)
+    assert faces.shape == (0, 3)
+    assert uv_faces.shape == (0, 3)
+
+
+def test_empty_binary_file(tmp_path):
+    path = tmp_path / f"mesh{MESH_SUFFIX}"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        read_mesh(path)
+
+
+def test_wrong_magic(tmp_path):
+    path = tmp_path / f"mesh{MESH_SUFFIX}"
+    write_mesh(path, VERTICES, UVS, FACES, UV_FACES)
+    data = bytearray(path.read_bytes())
+    data[:4] = b"OBJ "
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="isn't a UVgami mesh"):
+        read_mesh(path)
+
+
+def test_truncated_binary_file(tmp_path):
+    path = tmp_path / f"mesh{MESH_SUFFIX}"
+    write_mesh(path, VERTICES, UVS, FACES, UV_FACES)
+    path.write_bytes(path.read_bytes()[: MESH_HEADER + 8])
+    with pytest.raises(ValueError, match="incomplete"):
+        read_mesh(path)
@@ -0,0 +1,30 @@
+import numpy
+
+from src.job import _offset
+
+
+def test_offset_by_previous_sizes():
+    first = numpy.array(((0, 1, 2),))
+    second = numpy.array(((0, 1, 2), (2, 1, 0)))
+    third = numpy.array(((1, 0, 1),))
+    result = _offset([first, second, third], [3, 4, 5])
+    expected = ((0, 1, 2), (3, 4, 5), (5, 4, 3), (8, 7, 8))
+    numpy.testing.assert_array_equal(result, expected)
+
+
+def test_offset_single_part():
+    faces = numpy.array(((0, 1, 2), (1, 2, 3)))
+    numpy.testing.assert_array_equal(_offset([faces], [4]), faces)
+
+
+def test_offset_empty_part():
+    edges = numpy.array(((0, 1),))
+    empty = numpy.empty((0, 2), numpy.int64)
+    result = _offset([edges, empty, edges], [2, 3, 2])
+    # the empty part's size still moves the parts after it
+    numpy.testing.assert_array_equal(result, ((0, 1), (5, 6)))
+
+
+def test_offset_all_empty():
+    empty = numpy.empty((0, 3), numpy.int32)
+    assert _offset([empty, empty], [0, 0]).shape == (0, 3)
@@ -0,0 +1,143 @@
+import pytest
+
+from src.scheduler import PRIORITIES, QUALITY_COST, UnwrapQueue, relative_cost
+
+
+class Unwrap:
+    def __init__(self, faces, priority="NORMAL", join_job=None, quality="MEDIUM"):
+        self.face_count = faces
+        self.quality = quality
+        self.seam_weight = 3
+        self.guide_path = None
+        self.priority = PRIORITIES[priority]
+        self.join_job = join_job
+        self.is_paused = False
+
+
+def make_queue(*unwraps):
+    queue = UnwrapQueue()
+    for unwrap in unwraps:
+        queue.append(unwrap)
+    return queue
+
+
+def test_most_expensive_first():
+    small, big, medium = Unwrap(100), Unwrap(10000), Unwrap(1000)
+    queue = make_queue(small, big, medium)
+    assert list(queue) == [big, medium, small]
+
+
+def test_equal_cost_keeps_insertion_order():
+    first, second = Unwrap(500), Unwrap(500)
+    queue = make_queue(first, second)
+    assert list(queue) == [first, second]
+
+
+def test_group_stays_together():
+    job = object()
+    part_small, part_big = Unwrap(100, join_job=job), Unwrap(5000, join_job=job)
+    single = Unwrap(1000)
+    queue = make_queue(part_small, single, part_big)
+    # the group is ordered by its most expensive part
+    assert list(queue) == [part_big, part_small, single]
+
+
+def test_priority_before_cost():
+    big, urgent, minor = Unwrap(10000), Unwrap(10, "HIGH"), Unwrap(20000, "LOW")
+    queue = make_queue(big, urgent, minor)
+    assert list(queue) == [urgent, big, minor]
+
+
+def test_group_priority_is_highest_part():
+    job = object()
+    part, urgent_part = Unwrap(10, join_job=job), Unwrap(10, "HIGH", job)
+    single = Unwrap(10000)
+    queue = make_queue(single, part, urgent_part)
+    assert list(queue)[2] is single
+
+
+def test_started_group_goes_first():
+    job = object()
+    part_a, part_b = Unwrap(100, join_job=job), Unwrap(100, join_job=job)
+    single = Unwrap(1000)
+    other = Unwrap(50000)
+    queue = make_queue(part_a, part_b, single)
+    # the single unwrap is more expensive, so it starts first
+    assert queue.popleft() is single
+    assert queue.popleft() is part_a
+    queue.append(other)
+    # the rest of a started group goes before a new, bigger one
+    assert list(queue) == [part_b, other]
+
+
+def test_started_group_forgotten_when_empty():
+    job = object()
+    part = Unwrap(100, join_job=job)
+    queue = make_queue(part)
+    queue.popleft()
+    later, big = Unwrap(100, join_job=job), Unwrap(1000)
+    queue.append(later)
+    queue.append(big)
+    assert list(queue) == [big, later]
+
+
+def test_paused_skipped():
+    big, small = Unwrap(10000), Unwrap(100)
+    big.is_paused = True
+    queue = make_queue(big, small)
+    assert queue.peek() is small
+    assert queue.popleft() is small
+    assert queue.peek() is None
+    assert len(queue) == 1
+    big.is_paused = False
+    assert queue.popleft() is big
+
+
+def test_priority_change_resorts():
+    big, small = Unwrap(10000), Unwrap(100)
+    queue = make_queue(big, small)
+    assert queue.peek() is big
+    small.priority = PRIORITIES["HIGH"]
+    assert queue.peek() is small
+    assert list(queue) == [small, big]
+
+
+def test_pause_after_peek():
+    big, small = Unwrap(10000), Unwrap(100)
+    queue = make_queue(big, small)
+    assert queue.peek() is big
+    big.is_paused = True
+    assert queue.peek() is small
+    big.is_paused = False
+    assert queue.peek() is big
+
+
+def test_remove_and_cost():
+    unwrap = Unwrap(100)
+    queue = make_queue(unwrap)
+    assert unwrap in queue
+    assert queue.cost(unwrap) == relative_cost(100, "MEDIUM")
+    queue.remove(unwrap)
+    assert unwrap not in queue
+    assert queue.cost(unwrap) == 0
+    assert len(queue) == 0
+
+
+def test_relative_cost_grows_with_faces():
+    assert relative_cost(2000, "MEDIUM") > 2 * relative_cost(1000, "MEDIUM")
+
+
+def test_relative_cost_quality():
+    high, medium, low = (relative_cost(1000, q) for q in ("HIGH", "MEDIUM", "LOW"))
+    assert high > medium > low
+    assert high / medium == pytest.approx(QUALITY_COST["HIGH"])
+
+
+def test_relative_cost_seam_weight():
+    plain = relative_cost(1000, "MEDIUM")
+    assert relative_cost(1000, "MEDIUM", 0) == plain
+    assert relative_cost(1000, "MEDIUM", 5) > relative_cost(1000, "MEDIUM", 1) > plain
+
+
+def test_relative_cost_empty_mesh():
+    assert relative_cost(0, "MEDIUM") == relative_cost(1, "MEDIUM") > 0
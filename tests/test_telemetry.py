@@ -0,0 +1,25 @@
+from src.telemetry import FIELDS, parse_line
+
+
+def test_parse_line():
+    values = parse_line("12 0.5 3.25 1.5 0.1 0.2 0.3 0 1000")
+    assert values == (12.0, 0.5, 3.25, 1.5, 0.1, 0.2, 0.3, 0.0, 1000.0)
+    assert len(values) == len(FIELDS)
+
+
+def test_parse_line_extra_whitespace():
+    assert parse_line("  1 2 3 4 5 6 7 8 9 \n") == tuple(range(1, 10))
+
+
+def test_parse_line_scientific():
+    assert parse_line("1 1e-3 2E2 0 0 0 0 0 inf")[1:3] == (0.001, 200.0)
+
+
+def test_parse_line_wrong_count():
+    assert parse_line("1 2 3 4 5 6 7 8") is None
+    assert parse_line("1 2 3 4 5 6 7 8 9 10") is None
+    assert parse_line("") is None
+
+
+def test_parse_line_not_a_number():
+    assert parse_line("1 2 3 4 five 6 7 8 9") is None